@@ -0,0 +1,32 @@
+"""
+Console Input
+
+Async line input shared by the agents' interactive loops.
+"""
+
+import asyncio
+import threading
+
+
+async def ainput(prompt: str) -> str:
+    """
+    Read a line from stdin without blocking the event loop. The read runs in a
+    daemon thread, so an abandoned prompt (e.g. after Ctrl+C) never holds up exit.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def settle(method, value):
+        if not future.done():
+            method(value)
+    
+    def read():
+        try:
+            line = input(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(settle, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(settle, future.set_result, line)
+    
+    threading.Thread(target=read, daemon=True).start()
+    return await future
@@ -7,31 +7,100 @@ and complex multi-step workflows.
 """
 
 import asyncio
-import json
+import hashlib
+import logging
 import os
+import time
+import httpx
+import orjson
 from dotenv import load_dotenv
 import sys
-from typing import Dict, Any, List, Optional, Annotated
+from typing import Dict, Any, List, Optional, Annotated, AsyncIterator, Tuple
 
 # LangGraph imports
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
 from langchain_core.tools import tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langgraph.cache.memory import InMemoryCache
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode
+from langgraph.types import CachePolicy
 from typing_extensions import TypedDict
 
 # MCP client import
 from fastmcp import Client
+from fastmcp.client.transports import StreamableHttpTransport
+
+from console import ainput
 
 load_dotenv()  # Load environment variables from .env file
 
 # Gmail Agent System Prompt
 from prompts.gmail_prompt import GMAIL_SYSTEM_PROMPT
-
-class AgentState(TypedDict):
-    """State for the LangGraph Gmail agent"""
+from gmail_formatters import format_labels, format_message_detail, format_message_list, format_search_results
+
+logger = logging.getLogger(__name__)
+
+# Number of body characters the MCP server returns when displaying a message
+BODY_PREVIEW_CHARS = 1000
+
+# Maximum number of tool calls from a single model turn that run at once
+MAX_CONCURRENT_TOOL_CALLS = 5
+
+# Single-message write tools whose concurrent calls are coalesced into one
+# call to the matching bulk tool on the MCP server
+BATCHED_TOOLS = {
+    "mark_message_as_read": "mark_messages_as_read",
+    "mark_message_as_unread": "mark_messages_as_unread",
+    "add_label_to_message": "add_label_to_messages",
+    "remove_label_from_message": "remove_label_from_messages",
+}
+# Keep-alive pool for the MCP session, sized so concurrent tool calls reuse
+# open connections instead of dialing new ones
+MCP_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=50)
+MCP_HTTP_TIMEOUT = httpx.Timeout(30.0)
+
+def _pooled_http_client(headers=None, timeout=None, auth=None) -> httpx.AsyncClient:
+    """httpx client factory used by the MCP transport for the whole session"""
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout if timeout is not None else MCP_HTTP_TIMEOUT,
+        auth=auth,
+        limits=MCP_HTTP_LIMITS,
+        follow_redirects=True,
+    )
+
+# How long to wait for more calls to the same batched tool before flushing
+BATCH_WINDOW_SECONDS = 0.01
+
+# How long an agent-node response is reused for an identical conversation
+AGENT_CACHE_TTL_SECONDS = 60
+
+# Lifetime of the Gemini context cache holding the system prompt and tools;
+# requests switch back to sending the prompt a minute before it expires
+PROMPT_CACHE_TTL_SECONDS = 3600
+
+# Read-only tools whose results are cached, with their TTL in seconds
+CACHEABLE_TOOLS = {
+    "list_labels": 300,
+    "list_messages": 15,
+    "search_messages": 15,
+}
+# Cached tool results kept at once; the oldest is evicted when full
+TOOL_CACHE_MAX_ENTRIES = 256
+# Tools that change mailbox state and therefore invalidate cached results
+WRITE_TOOLS = frozenset({
+    "send_message",
+    "reply_to_message",
+    "mark_message_as_read",
+    "mark_message_as_unread",
+    "add_label_to_message",
+    "remove_label_from_message",
+})
+
+class AgentState(TypedDict, total=False):
+    """State for the LangGraph Gmail agent; only messages is required"""
     messages: Annotated[List, add_messages]
     current_message_id: Optional[str]
     current_thread_id: Optional[str]
@@ -39,20 +108,48 @@ class AgentState(TypedDict):
     search_context: Optional[str]
 
 
+def _agent_cache_key(state: AgentState) -> str:
+    """Cache key for the agent node: the conversation plus the context fed into the prompt"""
+    conversation = [
+        (m.type, m.content, [(tc["name"], tc["args"]) for tc in getattr(m, "tool_calls", None) or ()])
+        for m in state["messages"]
+    ]
+    payload = (
+        conversation,
+        state.get("current_message_id"),
+        state.get("search_context"),
+        state.get("last_operation"),
+    )
+    return hashlib.blake2b(orjson.dumps(payload), digest_size=16).hexdigest()
+
+
 class GmailMCPAgent:
     """LangGraph agent for Gmail automation via MCP"""
     
-    def __init__(self, mcp_url: str = "http://127.0.0.1:5001/mcp", google_api_key: str = None):
+    # Tool schemas are the same for every instance, so they are converted once
+    _TOOL_SCHEMA_CACHE: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    
+    def __init__(self, mcp_url: str = "http://127.0.0.1:5001/mcp", google_api_key: str = None,
+                 cache_prompt: Optional[bool] = None):
         """
         Initialize the Gmail MCP Agent
         
         Args:
             mcp_url: URL of the Gmail MCP server
             google_api_key: Google API key for the LLM
+            cache_prompt: Register the system prompt and tools as Gemini cached
+                content (defaults to the GMAIL_PROMPT_CACHE environment variable)
         """
         self.mcp_url = mcp_url
         self.mcp_client = None
         self.connected = False
+        self._pending_batches = {}
+        self._background_tasks = set()
+        self._cache = {}
+        self._cache_epoch = 0
+        self._prefetched = {}
+        # Lowercased label name -> label id, filled from list_labels responses
+        self._label_map = {}
         
         # Initialize LLM
         api_key = google_api_key or os.getenv("GOOGLE_API_KEY")
@@ -63,37 +160,62 @@ class GmailMCPAgent:
             model="gemini-2.0-flash-lite",
             google_api_key=api_key,
         )
+        # The system prompt is static, so build its message once and reuse it
+        self._base_system_message = SystemMessage(content=GMAIL_SYSTEM_PROMPT)
+        if cache_prompt is None:
+            cache_prompt = os.getenv("GMAIL_PROMPT_CACHE", "").lower() == "true"
+        self.cache_prompt = cache_prompt
+        self._cached_llm = None
+        self._prompt_cache_expires = 0.0
         
         # Tools will be populated after MCP connection
         self.tools = []
+        self._tool_map = {}
         self.graph = None
         
     async def __aenter__(self):
         """Async context manager entry"""
-        await self.connect_mcp()
-        await self.setup_tools()
-        self.setup_graph()
-        return self
+        return await self.start()
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
+        await self.close()
+
+    async def start(self):
+        """Connect to the MCP server and build the tools and graph"""
+        await self.connect_mcp()
+        # Tools and the compiled graph survive a disconnect, so restarting reuses them
+        if self.graph is None:
+            await self.setup_tools()
+            self.setup_graph()
+        return self
+
+    async def close(self):
+        """Disconnect from the MCP server"""
         await self.disconnect_mcp()
+
+    def new_conversation(self) -> "GmailConversation":
+        """Start a conversation that runs on this agent's connection and graph"""
+        return GmailConversation(self)
         
     async def connect_mcp(self):
         """Connect to the Gmail MCP server"""
         try:
             if not self.connected:
-                print("🔄 Connecting to Gmail MCP server...")
-                self.mcp_client = Client(self.mcp_url)
+                logger.info("🔄 Connecting to Gmail MCP server...")
+                transport = StreamableHttpTransport(self.mcp_url, httpx_client_factory=_pooled_http_client)
+                self.mcp_client = Client(transport)
                 await self.mcp_client.__aenter__()
                 self.connected = True
-                print("✅ Connected to Gmail MCP Server")
+                logger.info("✅ Connected to Gmail MCP Server")
         except Exception as e:
-            print(f"❌ Failed to connect to Gmail MCP server: {str(e)}")
-            print("\nTroubleshooting:")
-            print(f"1. Check if Gmail MCP server is running at: {self.mcp_url}")
-            print("2. Verify your Gmail API credentials are configured")
-            print("3. Make sure the MCP server dependencies are installed")
+            logger.error(
+                "❌ Failed to connect to Gmail MCP server: %s\n\nTroubleshooting:\n"
+                "1. Check if Gmail MCP server is running at: %s\n"
+                "2. Verify your Gmail API credentials are configured\n"
+                "3. Make sure the MCP server dependencies are installed",
+                e, self.mcp_url
+            )
             raise RuntimeError(f"Failed to initialize Gmail MCP server: {str(e)}")
 
     async def disconnect_mcp(self):
@@ -101,15 +223,112 @@ class GmailMCPAgent:
         if self.connected and self.mcp_client:
             await self.mcp_client.__aexit__(None, None, None)
             self.connected = False
-            print("🔌 Disconnected from Gmail MCP Server")
-            
-    async def call_mcp_tool(self, tool_name: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Call an MCP tool and parse the response"""
+            logger.info("🔌 Disconnected from Gmail MCP Server")
+            
+    async def call_mcp_tool(self, tool_name: str, **params: Any) -> Dict[str, Any]:
+        """Call an MCP tool with keyword arguments as its parameters and parse the response"""
+        if tool_name in WRITE_TOOLS:
+            # Entries from older epochs can never be hit again, including ones
+            # stored by reads that were still in flight during this write
+            self._cache_epoch += 1
+            self._cache.clear()
+            self._discard_prefetched()
+
+        if tool_name in CACHEABLE_TOOLS:
+            result = await self._call_cached_tool(tool_name, params)
+            if tool_name == "list_labels" and "error" not in result:
+                self._label_map = {label["name"].lower(): label["id"] for label in result.get("labels", [])}
+            return result
+        if tool_name in BATCHED_TOOLS and params:
+            return await self._call_batched_tool(tool_name, params)
+        return await self._call_mcp_tool(tool_name, params)
+
+    async def _call_cached_tool(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Serve a read-only tool from the TTL cache, calling the server on a miss"""
+        cache_key = (tool_name, frozenset(params.items()), self._cache_epoch)
+        cached = self._cache.get(cache_key)
+        if cached:
+            if cached[0] > time.monotonic():
+                return dict(cached[1])
+            del self._cache[cache_key]
+
+        result = await self._call_mcp_tool(tool_name, params)
+        if "error" not in result:
+            if len(self._cache) >= TOOL_CACHE_MAX_ENTRIES:
+                del self._cache[next(iter(self._cache))]
+            self._cache[cache_key] = (time.monotonic() + CACHEABLE_TOOLS[tool_name], result)
+        return dict(result)
+
+    def _prefetch_message(self, message_id: str):
+        """
+        Start fetching a message in the background, since the model usually
+        opens the top search result next; get_message picks up the result.
+        """
+        if message_id in self._prefetched:
+            return
+        self._discard_prefetched()
+        self._prefetched[message_id] = asyncio.create_task(
+            self.call_mcp_tool("get_message", message_id=message_id, max_body_chars=BODY_PREVIEW_CHARS)
+        )
+
+    def _discard_prefetched(self):
+        """Drop prefetched messages that have not been used yet"""
+        for task in self._prefetched.values():
+            task.cancel()
+        self._prefetched.clear()
+
+    async def _call_batched_tool(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a single-message call so concurrent calls share one bulk MCP call"""
+        batch_key = (tool_name, params.get("label_id"))
+        future = asyncio.get_running_loop().create_future()
+
+        pending = self._pending_batches.get(batch_key)
+        if pending is None:
+            pending = self._pending_batches[batch_key] = []
+            flush_task = asyncio.create_task(self._flush_batch(batch_key))
+            self._background_tasks.add(flush_task)
+            flush_task.add_done_callback(self._background_tasks.discard)
+        pending.append((params["message_id"], future))
+
+        return await future
+
+    async def _flush_batch(self, batch_key: tuple):
+        """Send all calls queued for a batch key as a single MCP call"""
+        await asyncio.sleep(BATCH_WINDOW_SECONDS)
+        pending = self._pending_batches.pop(batch_key)
+        tool_name, label_id = batch_key
+
+        if len(pending) == 1:
+            message_id, future = pending[0]
+            params = {"message_id": message_id}
+            if label_id is not None:
+                params["label_id"] = label_id
+            result = await self._call_mcp_tool(tool_name, params)
+            if not future.done():
+                future.set_result(result)
+            return
+
+        params = {"message_ids": [message_id for message_id, _ in pending]}
+        if label_id is not None:
+            params["label_id"] = label_id
+        result = await self._call_mcp_tool(BATCHED_TOOLS[tool_name], params)
+
+        results = result.get("results", {})
+        for message_id, future in pending:
+            if future.done():
+                continue
+            if "error" in result:
+                future.set_result(result)
+            else:
+                future.set_result(results.get(message_id, {"error": f"No result returned for message {message_id}"}))
+
+    async def _call_mcp_tool(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a single MCP tool call and parse the JSON response"""
         try:
             if not self.connected:
                 await self.connect_mcp()
                 
-            result = await self.mcp_client.call_tool(tool_name, params or {})
+            result = await self.mcp_client.call_tool(tool_name, params)
             
             if not result:
                 return {"error": "No result received from MCP server"}
@@ -117,14 +336,14 @@ class GmailMCPAgent:
             # Extract the text content from the first result item
             text_content = result[0].text
             # Parse the JSON response
-            parsed_result = json.loads(text_content)
+            parsed_result = orjson.loads(text_content)
             
-            print(f"🔧 Called Gmail MCP tool '{tool_name}' - Success: {'error' not in parsed_result}")
+            logger.debug("🔧 Called Gmail MCP tool '%s' - Success: %s", tool_name, "error" not in parsed_result)
             return parsed_result
             
         except Exception as e:
             error_msg = f"Error calling MCP tool {tool_name}: {str(e)}"
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             return {"error": error_msg}
 
     async def setup_tools(self):
@@ -138,10 +357,7 @@ class GmailMCPAgent:
                 query: Search query (e.g., 'from:user@example.com is:unread', 'subject:important')
                 max_results: Maximum number of messages to return (default: 10)
             """
-            result = await self.call_mcp_tool("list_messages", {
-                "query": query,
-                "max_results": max_results
-            })
+            result = await self.call_mcp_tool("list_messages", query=query, max_results=max_results)
             
             if "error" in result:
                 return f"Error listing messages: {result['error']}"
@@ -149,21 +365,9 @@ class GmailMCPAgent:
             messages = result.get("messages", [])
             if not messages:
                 return f"No messages found{' for query: ' + query if query else ''}."
+            self._prefetch_message(messages[0]["id"])
             
-            output = f"Found {len(messages)} messages{' for query: ' + query if query else ''}:\n\n"
-            for i, msg in enumerate(messages, 1):
-                from_addr = msg.get('from', 'Unknown')[:30]
-                subject = msg.get('subject', 'No Subject')[:50]
-                date = msg.get('date', 'Unknown')[:20]
-                labels = ', '.join(msg.get('labelIds', [])[:3])
-                
-                output += f"{i}. From: {from_addr}\n"
-                output += f"   Subject: {subject}\n"
-                output += f"   Date: {date}\n"
-                output += f"   Labels: {labels}\n"
-                output += f"   ID: {msg.get('id', 'Unknown')}\n\n"
-            
-            return output
+            return format_message_list(messages, query)
 
         @tool
         async def get_message(message_id: str) -> str:
@@ -172,7 +376,11 @@ class GmailMCPAgent:
             Args:
                 message_id: The ID of the message to retrieve
             """
-            result = await self.call_mcp_tool("get_message", {"message_id": message_id})
+            prefetched = self._prefetched.pop(message_id, None)
+            if prefetched is not None:
+                result = await prefetched
+            else:
+                result = await self.call_mcp_tool("get_message", message_id=message_id, max_body_chars=BODY_PREVIEW_CHARS)
             
             if "error" in result:
                 return f"Error getting message: {result['error']}"
@@ -181,29 +389,7 @@ class GmailMCPAgent:
             if not message:
                 return "Message not found."
             
-            output = "📧 Message Details:\n"
-            output += f"From: {message.get('from', 'Unknown')}\n"
-            output += f"To: {message.get('to', 'Unknown')}\n"
-            output += f"Subject: {message.get('subject', 'No Subject')}\n"
-            output += f"Date: {message.get('date', 'Unknown')}\n"
-            output += f"Labels: {', '.join(message.get('labelIds', []))}\n"
-            
-            if message.get('cc'):
-                output += f"CC: {message['cc']}\n"
-            
-            body = message.get('body', '')
-            if body:
-                output += f"\n📝 Body:\n{body[:1000]}"
-                if len(body) > 1000:
-                    output += "... (truncated)"
-            
-            attachments = message.get('attachments', [])
-            if attachments:
-                output += f"\n\n📎 Attachments ({len(attachments)}):\n"
-                for att in attachments:
-                    output += f"  • {att.get('filename', 'Unknown')} ({att.get('mimeType', 'Unknown type')})\n"
-            
-            return output
+            return format_message_detail(message)
 
         @tool
         async def search_messages(query: str, max_results: int = 10) -> str:
@@ -213,10 +399,7 @@ class GmailMCPAgent:
                 query: Gmail search query (e.g., 'from:boss@company.com after:2023/01/01')
                 max_results: Maximum number of results (default: 10)
             """
-            result = await self.call_mcp_tool("search_messages", {
-                "query": query,
-                "max_results": max_results
-            })
+            result = await self.call_mcp_tool("search_messages", query=query, max_results=max_results)
             
             if "error" in result:
                 return f"Error searching messages: {result['error']}"
@@ -224,15 +407,9 @@ class GmailMCPAgent:
             messages = result.get("messages", [])
             if not messages:
                 return f"No messages found for search query: {query}"
+            self._prefetch_message(messages[0]["id"])
             
-            output = f"🔍 Search Results ({len(messages)} messages) for: {query}\n\n"
-            for i, msg in enumerate(messages, 1):
-                output += f"{i}. {msg.get('subject', 'No Subject')}\n"
-                output += f"   From: {msg.get('from', 'Unknown')}\n"
-                output += f"   Date: {msg.get('date', 'Unknown')}\n"
-                output += f"   ID: {msg.get('id', 'Unknown')}\n\n"
-            
-            return output
+            return format_search_results(messages, query)
 
         @tool
         async def send_message(to: str, subject: str, body: str, cc: str = "", bcc: str = "") -> str:
@@ -245,17 +422,9 @@ class GmailMCPAgent:
                 cc: CC recipients (optional)
                 bcc: BCC recipients (optional)
             """
-            params = {
-                "to": to,
-                "subject": subject,
-                "body": body
-            }
-            if cc:
-                params["cc"] = cc
-            if bcc:
-                params["bcc"] = bcc
-            
-            result = await self.call_mcp_tool("send_message", params)
+            result = await self.call_mcp_tool(
+                "send_message", to=to, subject=subject, body=body, cc=cc or None, bcc=bcc or None
+            )
             
             if "error" in result:
                 return f"Error sending message: {result['error']}"
@@ -274,10 +443,7 @@ class GmailMCPAgent:
                 message_id: ID of the message to reply to
                 reply_body: Content of the reply
             """
-            result = await self.call_mcp_tool("reply_to_message", {
-                "message_id": message_id,
-                "reply_body": reply_body
-            })
+            result = await self.call_mcp_tool("reply_to_message", message_id=message_id, reply_body=reply_body)
             
             if "error" in result:
                 return f"Error sending reply: {result['error']}"
@@ -295,7 +461,7 @@ class GmailMCPAgent:
             Args:
                 message_id: ID of the message to mark as read
             """
-            result = await self.call_mcp_tool("mark_message_as_read", {"message_id": message_id})
+            result = await self.call_mcp_tool("mark_message_as_read", message_id=message_id)
             
             if "error" in result:
                 return f"Error marking message as read: {result['error']}"
@@ -312,7 +478,7 @@ class GmailMCPAgent:
             Args:
                 message_id: ID of the message to mark as unread
             """
-            result = await self.call_mcp_tool("mark_message_as_unread", {"message_id": message_id})
+            result = await self.call_mcp_tool("mark_message_as_unread", message_id=message_id)
             
             if "error" in result:
                 return f"Error marking message as unread: {result['error']}"
@@ -330,17 +496,17 @@ class GmailMCPAgent:
                 message_id: ID of the message
                 label_id: ID of the label to add (e.g., 'IMPORTANT', 'STARRED')
             """
-            result = await self.call_mcp_tool("add_label_to_message", {
-                "message_id": message_id,
-                "label_id": label_id
-            })
+            result = await self.call_mcp_tool("add_label_to_message", message_id=message_id, label_id=label_id)
             
             if "error" in result:
                 return f"Error adding label: {result['error']}"
             
             if result.get("success"):
-                current_labels = ', '.join(result.get("labelIds", []))
-                return f"✅ Label '{label_id}' added to message (ID: {message_id})\nCurrent labels: {current_labels}"
+                response = f"✅ Label '{label_id}' added to message (ID: {message_id})"
+                # Bulk (batchModify) results do not include the message's labels
+                if result.get("labelIds"):
+                    response += f"\nCurrent labels: {', '.join(result['labelIds'])}"
+                return response
             
             return "Failed to add label."
 
@@ -352,17 +518,17 @@ class GmailMCPAgent:
                 message_id: ID of the message
                 label_id: ID of the label to remove
             """
-            result = await self.call_mcp_tool("remove_label_from_message", {
-                "message_id": message_id,
-                "label_id": label_id
-            })
+            result = await self.call_mcp_tool("remove_label_from_message", message_id=message_id, label_id=label_id)
             
             if "error" in result:
                 return f"Error removing label: {result['error']}"
             
             if result.get("success"):
-                current_labels = ', '.join(result.get("labelIds", []))
-                return f"✅ Label '{label_id}' removed from message (ID: {message_id})\nCurrent labels: {current_labels}"
+                response = f"✅ Label '{label_id}' removed from message (ID: {message_id})"
+                # Bulk (batchModify) results do not include the message's labels
+                if result.get("labelIds"):
+                    response += f"\nCurrent labels: {', '.join(result['labelIds'])}"
+                return response
             
             return "Failed to remove label."
 
@@ -378,18 +544,21 @@ class GmailMCPAgent:
             if not labels:
                 return "No labels found."
             
-            output = f"📂 Available Gmail Labels ({len(labels)}):\n\n"
-            for label in labels:
-                name = label.get('name', 'Unknown')
-                label_id = label.get('id', 'Unknown')
-                label_type = label.get('type', 'Unknown')
-                total = label.get('messagesTotal', 0)
-                unread = label.get('messagesUnread', 0)
-                
-                output += f"• {name} (ID: {label_id})\n"
-                output += f"  Type: {label_type} | Total: {total} | Unread: {unread}\n\n"
+            return format_labels(labels)
+
+        @tool
+        async def resolve_label(name: str) -> str:
+            """Get the label ID for a Gmail label name, e.g. before adding or removing a label."""
+            if not self._label_map:
+                result = await self.call_mcp_tool("list_labels")
+                if "error" in result:
+                    return f"Error resolving label: {result['error']}"
+            
+            label_id = self._label_map.get(name.strip().lower())
+            if label_id is None:
+                return f"No label named '{name}'. Use list_labels to see the available labels."
             
-            return output
+            return f"Label '{name}' has ID: {label_id}"
 
         # Store tools for the graph
         self.tools = [
@@ -397,19 +566,48 @@ class GmailMCPAgent:
             send_message, reply_to_message,
             mark_message_as_read, mark_message_as_unread,
             add_label_to_message, remove_label_from_message,
-            list_labels
+            list_labels, resolve_label
         ]
+        # The tools node calls the underlying coroutines directly; the decorated
+        # tools are only needed to give the LLM their schemas
+        self._tool_map = {t.name: t.coroutine for t in self.tools}
         
-        print(f"🛠️  Setup {len(self.tools)} Gmail LangGraph tools")
+        logger.info("🛠️  Setup %d Gmail LangGraph tools", len(self.tools))
 
     def setup_graph(self):
         """Setup the LangGraph workflow"""
         
-        # Bind tools to LLM
-        llm_with_tools = self.llm.bind_tools(self.tools)
+        # Bind tools to LLM, reusing schemas already built by another instance
+        tools_key = tuple(t.name for t in self.tools)
+        tool_schemas = self._TOOL_SCHEMA_CACHE.get(tools_key)
+        if tool_schemas is None:
+            tool_schemas = self._TOOL_SCHEMA_CACHE[tools_key] = [convert_to_openai_tool(t) for t in self.tools]
+        llm_with_tools = self.llm.bind_tools(tool_schemas)
+        if self.cache_prompt:
+            self._create_prompt_cache(tool_schemas)
         
-        # Create tool node
-        tool_node = ToolNode(self.tools)
+        # Tool calls from one model turn are independent MCP round-trips,
+        # so run them concurrently instead of one after another
+        tool_semaphore = asyncio.Semaphore(MAX_CONCURRENT_TOOL_CALLS)
+
+        async def run_tool_call(tool_call: Dict[str, Any]) -> ToolMessage:
+            """Run a single tool call and wrap its output in a ToolMessage"""
+            tool_name = tool_call["name"]
+            async with tool_semaphore:
+                if tool_name not in self._tool_map:
+                    content = f"Error: {tool_name} is not a valid tool."
+                else:
+                    try:
+                        content = await self._tool_map[tool_name](**tool_call["args"])
+                    except Exception as e:
+                        content = f"Error running tool {tool_name}: {str(e)}"
+            return ToolMessage(content=content, name=tool_name, tool_call_id=tool_call["id"])
+
+        async def tool_node(state: AgentState):
+            """Execute all tool calls from the last model turn concurrently"""
+            tool_calls = state["messages"][-1].tool_calls
+            tool_messages = await asyncio.gather(*(run_tool_call(tc) for tc in tool_calls))
+            return {"messages": list(tool_messages)}
         
         def should_continue(state: AgentState) -> str:
             """Determine if we should continue to tools or end"""
@@ -426,9 +624,6 @@ class GmailMCPAgent:
             """Call the model with current state"""
             messages = state["messages"]
             
-            # Add system message with context
-            system_message = SystemMessage(content=GMAIL_SYSTEM_PROMPT)
-            
             # Add context if available
             context_info = ""
             if state.get("current_message_id"):
@@ -439,20 +634,37 @@ class GmailMCPAgent:
                 context_info += f"Last operation: {state['last_operation']}\n"
             
             if context_info:
-                enhanced_prompt = GMAIL_SYSTEM_PROMPT + f"\n\nCurrent Context:\n{context_info}"
-                system_message = SystemMessage(content=enhanced_prompt)
-            
-            # Combine system message with conversation
-            full_messages = [system_message] + messages
-            
-            response = await llm_with_tools.ainvoke(full_messages)
+                llm = llm_with_tools
+                full_messages = [
+                    SystemMessage(content=f"{GMAIL_SYSTEM_PROMPT}\n\nCurrent Context:\n{context_info}"),
+                    *messages
+                ]
+            elif self._cached_llm is not None and time.monotonic() < self._prompt_cache_expires:
+                # The cached content already carries the system prompt and tools
+                llm = self._cached_llm
+                full_messages = messages
+            else:
+                llm = llm_with_tools
+                full_messages = [self._base_system_message, *messages]
+            
+            # Stream the response so tokens can be surfaced as they arrive;
+            # tool-call chunks are merged into the final message before routing
+            response = None
+            async for chunk in llm.astream(full_messages):
+                response = chunk if response is None else response + chunk
             return {"messages": [response]}
 
         # Build graph
         workflow = StateGraph(AgentState)
         
         # Add nodes
-        workflow.add_node("agent", call_model)
+        # Identical conversations (retries, repeated turns) are answered from
+        # the node cache instead of another Gemini call
+        workflow.add_node(
+            "agent",
+            call_model,
+            cache_policy=CachePolicy(key_func=_agent_cache_key, ttl=AGENT_CACHE_TTL_SECONDS),
+        )
         workflow.add_node("tools", tool_node)
         
         # Add edges
@@ -461,8 +673,33 @@ class GmailMCPAgent:
         workflow.add_edge("tools", "agent")
         
         # Compile the graph
-        self.graph = workflow.compile()
-        print("📊 Gmail LangGraph workflow compiled successfully")
+        self.graph = workflow.compile(cache=InMemoryCache())
+        logger.info("📊 Gmail LangGraph workflow compiled successfully")
+
+    def _create_prompt_cache(self, tool_schemas: List[Dict[str, Any]]):
+        """Register the system prompt and tools as Gemini cached content"""
+        try:
+            from langchain_google_genai import create_context_cache
+        except ImportError:
+            logger.warning("⚠️  Installed langchain-google-genai does not support context caching; sending the prompt inline")
+            return
+        
+        try:
+            cache_name = create_context_cache(
+                self.llm,
+                [self._base_system_message],
+                tools=tool_schemas,
+                ttl=f"{PROMPT_CACHE_TTL_SECONDS}s",
+            )
+        except Exception as e:
+            # e.g. the model has no caching support or the prompt is below its minimum size
+            logger.warning("⚠️  Could not cache the system prompt, sending it inline: %s", e)
+            return
+        
+        # Requests using cached content must not set tools or a system instruction
+        self._cached_llm = self.llm.bind(cached_content=cache_name)
+        self._prompt_cache_expires = time.monotonic() + PROMPT_CACHE_TTL_SECONDS - 60
+        logger.info("🗄️  Cached the Gmail system prompt as %s", cache_name)
 
     async def chat(self, message: str, state: Optional[AgentState] = None) -> tuple[str, AgentState]:
         """
@@ -478,21 +715,8 @@ class GmailMCPAgent:
         if not self.graph:
             raise RuntimeError("Agent not properly initialized. Use async context manager.")
         
-        # Initialize state if not provided
-        if state is None:
-            state = AgentState(
-                messages=[],
-                current_message_id=None,
-                current_thread_id=None,
-                last_operation=None,
-                search_context=None
-            )
-        
-        # Add user message to state
-        state["messages"].append(HumanMessage(content=message))
-        
         # Run the graph
-        result = await self.graph.ainvoke(state)
+        result = await self.graph.ainvoke(self._graph_input(message, state))
         
         # Extract the response
         last_message = result["messages"][-1]
@@ -500,8 +724,55 @@ class GmailMCPAgent:
         
         return response, result
 
+    async def chat_stream(self, message: str, state: Optional[AgentState] = None) -> AsyncIterator[Tuple[str, Optional[AgentState]]]:
+        """
+        Chat with the Gmail agent, streaming the response as it is generated
+        
+        Args:
+            message: User message
+            state: Current conversation state (optional)
+            
+        Yields:
+            (token, None) for each chunk of response text, followed by
+            ("", updated_state) once the run has finished
+        """
+        if not self.graph:
+            raise RuntimeError("Agent not properly initialized. Use async context manager.")
+        
+        result = graph_input = self._graph_input(message, state)
+        streamed_ids = set()
+        
+        async for mode, payload in self.graph.astream(graph_input, stream_mode=["messages", "values"]):
+            if mode == "values":
+                result = payload
+                continue
+            chunk, metadata = payload
+            if metadata.get("langgraph_node") == "agent" and isinstance(chunk.content, str) and chunk.content:
+                streamed_ids.add(chunk.id)
+                yield chunk.content, None
+        
+        # A response served from the node cache is never streamed, so emit it whole
+        last_message = result["messages"][-1]
+        if last_message.id not in streamed_ids and isinstance(last_message.content, str) and last_message.content:
+            yield last_message.content, None
+        
+        yield "", result
+
+    def _graph_input(self, message: str, state: Optional[AgentState]) -> AgentState:
+        """Build the input for a new turn without mutating the caller's state"""
+        user_message = HumanMessage(content=message)
+        if not state:
+            return {"messages": [user_message]}
+        # The graph has no checkpointer, so the history is passed in and the
+        # add_messages reducer rebuilds it on a fresh channel
+        return {**state, "messages": [*state.get("messages", []), user_message]}
+
     async def run_interactive(self):
         """Run an interactive chat session"""
+        # Line-buffer stdout so UI output is written as each line completes
+        if hasattr(sys.stdout, "reconfigure"):
+            sys.stdout.reconfigure(line_buffering=True)
+        
         print("\n📧 Gmail Agent (powered by LangGraph + MCP)")
         print("Type 'quit', 'exit', or 'bye' to end the conversation")
         print("=" * 60)
@@ -513,11 +784,13 @@ class GmailMCPAgent:
         print("• 'Reply to the latest email'")
         print("=" * 60)
         
-        state = None
+        conversation = self.new_conversation()
         
         while True:
             try:
-                user_input = input("\n👤 You: ").strip()
+                # Read without blocking, so the event loop keeps serving background
+                # work (batch flushes, MCP keepalive) while the user types
+                user_input = (await ainput("\n👤 You: ")).strip()
                 
                 if user_input.lower() in ['quit', 'exit', 'bye', 'q']:
                     print("\n👋 Goodbye! Have a great day with your emails!")
@@ -526,11 +799,12 @@ class GmailMCPAgent:
                 if not user_input:
                     continue
                 
-                print("📧 Gmail Agent: Processing...")
-                response, state = await self.chat(user_input, state)
-                print(f"📧 Gmail Agent: {response}")
+                print("📧 Gmail Agent: ", end="", flush=True)
+                async for token in conversation.send_stream(user_input):
+                    print(token, end="", flush=True)
+                print()
                 
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError):
                 print("\n\n👋 Goodbye! Have a great day with your emails!")
                 break
             except Exception as e:
@@ -538,8 +812,64 @@ class GmailMCPAgent:
                 print("Please try again or type 'quit' to exit.")
 
 
+class GmailConversation:
+    """
+    A single Gmail chat on a shared GmailMCPAgent
+    
+    The agent owns the MCP connection, tools and compiled graph; a
+    conversation only carries its own AgentState between turns.
+    """
+    
+    def __init__(self, agent: GmailMCPAgent):
+        self.agent = agent
+        self.state: Optional[AgentState] = None
+    
+    async def send(self, message: str) -> str:
+        """Send a message and return the agent's response"""
+        response, self.state = await self.agent.chat(message, self.state)
+        return response
+    
+    async def send_stream(self, message: str) -> AsyncIterator[str]:
+        """Send a message and yield the agent's response as it is generated"""
+        async for token, final_state in self.agent.chat_stream(message, self.state):
+            if final_state is None:
+                yield token
+            else:
+                self.state = final_state
+
+
+# One agent per process: conversations share its MCP connection and graph
+# instead of paying connect/setup/compile for every chat
+_shared_agent: Optional[GmailMCPAgent] = None
+_shared_agent_lock = asyncio.Lock()
+
+
+async def get_shared_agent(google_api_key: str = None, mcp_url: str = "http://127.0.0.1:5001/mcp") -> GmailMCPAgent:
+    """Get the process-wide Gmail agent, starting it on first use"""
+    global _shared_agent
+    async with _shared_agent_lock:
+        if _shared_agent is None:
+            agent = GmailMCPAgent(mcp_url=mcp_url, google_api_key=google_api_key)
+            await agent.start()
+            _shared_agent = agent
+        return _shared_agent
+
+
+async def close_shared_agent():
+    """Close the process-wide Gmail agent if it was started"""
+    global _shared_agent
+    async with _shared_agent_lock:
+        if _shared_agent is not None:
+            await _shared_agent.close()
+            _shared_agent = None
+
+
 async def main():
     """Main function to run the Gmail agent"""
+    logging.basicConfig(
+        level=logging.DEBUG if os.getenv("DEBUG", "").lower() == "true" else logging.INFO,
+        format="%(message)s"
+    )
     
     # Get Google API key
     google_api_key = os.getenv("GOOGLE_API_KEY")
@@ -550,13 +880,20 @@ async def main():
 
     # Initialize and run the agent
     try:
-        async with GmailMCPAgent(google_api_key=google_api_key) as agent:
-            print("✅ Gmail Agent initialized successfully")
-            await agent.run_interactive()
+        agent = await get_shared_agent(google_api_key=google_api_key)
+        print("✅ Gmail Agent initialized successfully")
+        await agent.run_interactive()
     except Exception as e:
         print(f"❌ Failed to initialize Gmail agent: {str(e)}")
         print("Make sure your Gmail MCP server is properly configured and running.")
+    finally:
+        await close_shared_agent()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        import uvloop
+    except ImportError:  # uvloop is not available on Windows
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file
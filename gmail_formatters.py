@@ -0,0 +1,91 @@
+"""
+Gmail Agent Formatters
+
+Turns Gmail MCP server responses into the text returned by the agent's tools.
+The functions are fully annotated so the module can be compiled with mypyc
+(`mypyc gmail_formatters.py`); the compiled extension is picked up in place
+of this file automatically when present.
+"""
+
+from typing import Any, Dict, List
+
+
+def format_message_list(messages: List[Dict[str, Any]], query: str) -> str:
+    """Format a list_messages result"""
+    parts: List[str] = [f"Found {len(messages)} messages{' for query: ' + query if query else ''}:\n\n"]
+    for i, msg in enumerate(messages, 1):
+        from_addr: str = msg.get('from', 'Unknown')[:30]
+        subject: str = msg.get('subject', 'No Subject')[:50]
+        date: str = msg.get('date', 'Unknown')[:20]
+        labels: str = ', '.join(msg.get('labelIds', [])[:3])
+
+        parts.append(
+            f"{i}. From: {from_addr}\n"
+            f"   Subject: {subject}\n"
+            f"   Date: {date}\n"
+            f"   Labels: {labels}\n"
+            f"   ID: {msg.get('id', 'Unknown')}\n\n"
+        )
+
+    return "".join(parts)
+
+
+def format_search_results(messages: List[Dict[str, Any]], query: str) -> str:
+    """Format a search_messages result"""
+    parts: List[str] = [f"🔍 Search Results ({len(messages)} messages) for: {query}\n\n"]
+    for i, msg in enumerate(messages, 1):
+        parts.append(
+            f"{i}. {msg.get('subject', 'No Subject')}\n"
+            f"   From: {msg.get('from', 'Unknown')}\n"
+            f"   Date: {msg.get('date', 'Unknown')}\n"
+            f"   ID: {msg.get('id', 'Unknown')}\n\n"
+        )
+
+    return "".join(parts)
+
+
+def format_message_detail(message: Dict[str, Any]) -> str:
+    """Format a get_message result"""
+    parts: List[str] = [
+        "📧 Message Details:\n",
+        f"From: {message.get('from', 'Unknown')}\n",
+        f"To: {message.get('to', 'Unknown')}\n",
+        f"Subject: {message.get('subject', 'No Subject')}\n",
+        f"Date: {message.get('date', 'Unknown')}\n",
+        f"Labels: {', '.join(message.get('labelIds', []))}\n",
+    ]
+
+    if message.get('cc'):
+        parts.append(f"CC: {message['cc']}\n")
+
+    body: str = message.get('body', '')
+    if body:
+        parts.append(f"\n📝 Body:\n{body}")
+        if message.get('bodyTruncated'):
+            parts.append("... (truncated)")
+
+    attachments: List[Dict[str, Any]] = message.get('attachments', [])
+    if attachments:
+        parts.append(f"\n\n📎 Attachments ({len(attachments)}):\n")
+        for att in attachments:
+            parts.append(f"  • {att.get('filename', 'Unknown')} ({att.get('mimeType', 'Unknown type')})\n")
+
+    return "".join(parts)
+
+
+def format_labels(labels: List[Dict[str, Any]]) -> str:
+    """Format a list_labels result"""
+    parts: List[str] = [f"📂 Available Gmail Labels ({len(labels)}):\n\n"]
+    for label in labels:
+        name: str = label.get('name', 'Unknown')
+        label_id: str = label.get('id', 'Unknown')
+        label_type: str = label.get('type', 'Unknown')
+        total: int = label.get('messagesTotal', 0)
+        unread: int = label.get('messagesUnread', 0)
+
+        parts.append(
+            f"• {name} (ID: {label_id})\n"
+            f"  Type: {label_type} | Total: {total} | Unread: {unread}\n\n"
+        )
+
+    return "".join(parts)
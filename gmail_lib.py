@@ -5,85 +5,294 @@ This module provides functions to interact with Gmail API using OAuth2 authentic
 """
 
 import os
+import asyncio
 import json
-import base64
+import random
+import re
 import webbrowser
 import threading
 import time
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from email import policy
+from email.message import EmailMessage
 from urllib.parse import parse_qs, urlparse
+import logging
+import httplib2
+import httpx
+from google.auth.exceptions import RefreshError, TransportError
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 import mimetypes
 from typing import List, Dict, Any, Optional
 
-# Global variable to store the authorization code
-auth_code = None
+try:
+    # SIMD-accelerated drop-in replacement for the base64 module
+    import pybase64 as b64
+except ImportError:
+    import base64 as b64
 
-class AuthCodeHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        global auth_code
-        
-        # Parse the URL query parameters to extract the code
-        query_components = parse_qs(urlparse(self.path).query)
-        if 'code' in query_components:
-            auth_code = query_components['code'][0]
-            
-            # Send a response to the browser
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# Requests that fail with 429/5xx (or a rate-limit 403) are retried this many
+# times with randomized exponential backoff by googleapiclient
+API_NUM_RETRIES = 4
+
+# Local OAuth redirect target; must match the Google Cloud Console configuration
+OAUTH_CALLBACK_PORT = 5000
+OAUTH_REDIRECT_URI = f'http://localhost:{OAUTH_CALLBACK_PORT}/oauth2callback'
+# The callback server listens on IPv4 loopback only, rather than whatever
+# 'localhost' resolves to (possibly several addresses, some not loopback-only)
+OAUTH_CALLBACK_BIND = '127.0.0.1'
+AUTH_TIMEOUT_SECONDS = 120
+
+AUTH_SUCCESS_HTML = """
+<html>
+<head><title>Authentication Successful</title></head>
+<body>
+    <h1>Authentication Successful!</h1>
+    <p>You can now close this browser window and return to your application.</p>
+</body>
+</html>
+"""
+
+AUTH_FAILURE_HTML = """
+<html>
+<head><title>Authentication Failed</title></head>
+<body>
+    <h1>Authentication Failed</h1>
+    <p>No authorization code found in the response.</p>
+</body>
+</html>
+"""
+
+TOKEN_FILE = 'gmail_token.json'
+CREDENTIALS_FILE = 'gmail_credentials.json'
+SCOPES = [
+    'https://www.googleapis.com/auth/gmail.readonly',
+    'https://www.googleapis.com/auth/gmail.send',
+    'https://www.googleapis.com/auth/gmail.modify'
+]
+
+# Built services keyed by token file, as (credentials, service). Building a
+# service parses the whole discovery document, so it is done once per process
+_SERVICE_CACHE = {}
+_SERVICE_LOCK = threading.Lock()
+
+# httplib2 connections are not thread-safe, so each thread gets its own
+_thread_local = threading.local()
+
+def _local_http():
+    """Get this thread's keep-alive httplib2 connection"""
+    http = getattr(_thread_local, 'http', None)
+    if http is None:
+        http = _thread_local.http = httplib2.Http(timeout=30)
+    return http
+
+class _PerThreadHttp:
+    """Stands in for one httplib2.Http under the shared service, sending each
+    request on the calling thread's own connection"""
+    
+    def request(self, *args, **kwargs):
+        return _local_http().request(*args, **kwargs)
+    
+    def __getattr__(self, name):
+        return getattr(_local_http(), name)
+
+# Responses are not cached: Gmail marks them private, max-age=0, and an
+# httplib2 disk cache would still keep every message body it fetched
+_HTTP = _PerThreadHttp()
+
+# Tokens this close to expiry are refreshed on a background thread while the
+# current token keeps serving requests, instead of stalling a call at expiry
+TOKEN_REFRESH_WINDOW = timedelta(minutes=5)
+_refresh_lock = threading.Lock()
+_refreshing = threading.Event()
+
+# Recently fetched get_message results, as message id -> (expiry, message).
+# Content never changes; label edits through this module evict the entry
+MESSAGE_CACHE_SIZE = 512
+MESSAGE_CACHE_TTL = 600
+_message_cache = OrderedDict()
+_message_cache_lock = threading.Lock()
+
+# Gmail accepts up to 100 calls per batch request, but large batches are
+# more likely to be rate limited, so detail fetches are grouped in 50s
+GMAIL_BATCH_SIZE = int(os.getenv('GMAIL_BATCH_SIZE', '50'))
+METADATA_HEADERS = ['Subject', 'From', 'To', 'Date']
+# Partial responses: summaries only read these fields, so the rest of each
+# resource (sizeEstimate, historyId, MIME part info...) is never sent
+METADATA_FIELDS = 'id,threadId,snippet,labelIds,payload/headers'
+LIST_FIELDS = 'messages/id'
+SUMMARY_HEADERS = frozenset(('subject', 'from', 'to', 'date'))
+REPLY_HEADERS = frozenset(('subject', 'from', 'message-id', 'references'))
+# Any run of leading "Re:" prefixes, in any case, e.g. "RE: Re: Lunch"
+REPLY_PREFIX = re.compile(r'^(re:\s*)+', re.IGNORECASE)
+# Worker threads for fetching message details when batching is not possible
+DETAIL_FETCH_WORKERS = 10
+
+async def _receive_auth_code(auth_url, timeout):
+    """Serve the OAuth redirect once and return the authorization code it carries"""
+    code_future = asyncio.get_running_loop().create_future()
+    
+    async def handle(reader, writer):
+        try:
+            request_line = await reader.readline()
+            # Drain the request headers
+            while (await reader.readline()).strip():
+                pass
+            parts = request_line.decode('latin-1').split()
+            query = parse_qs(urlparse(parts[1]).query) if len(parts) > 1 else {}
             
-            response_content = """
-            <html>
-            <head><title>Authentication Successful</title></head>
-            <body>
-                <h1>Authentication Successful!</h1>
-                <p>You can now close this browser window and return to your application.</p>
-            </body>
-            </html>
-            """
-            self.wfile.write(response_content.encode('utf-8'))
-        else:
-            self.send_response(400)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
+            if 'code' in query:
+                status, content = '200 OK', AUTH_SUCCESS_HTML
+                if not code_future.done():
+                    code_future.set_result(query['code'][0])
+            else:
+                status, content = '400 Bad Request', AUTH_FAILURE_HTML
             
-            error_content = """
-            <html>
-            <head><title>Authentication Failed</title></head>
-            <body>
-                <h1>Authentication Failed</h1>
-                <p>No authorization code found in the response.</p>
-            </body>
-            </html>
-            """
-            self.wfile.write(error_content.encode('utf-8'))
-
-    def log_message(self, format, *args):
-        # Suppress log messages
-        pass
+            body = content.encode('utf-8')
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/html\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+    
+    # reuse_address lets a retried sign-in re-bind the port while the last
+    # attempt's connections are still in TIME_WAIT
+    server = await asyncio.start_server(handle, OAUTH_CALLBACK_BIND, OAUTH_CALLBACK_PORT, reuse_address=True)
+    async with server:
+        print(f"Opening browser for Gmail authentication...")
+        print(f"If the browser doesn't open automatically, visit: {auth_url}")
+        
+        # Open the authorization URL in the default browser
+        webbrowser.open(auth_url)
+        
+        # Wait for the authorization code
+        print("Waiting for authorization...")
+        try:
+            return await asyncio.wait_for(code_future, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError("Authorization timed out")
+
+def _wait_for_auth_code(auth_url, timeout=AUTH_TIMEOUT_SECONDS):
+    """Run the OAuth callback server to completion from synchronous code"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_receive_auth_code(auth_url, timeout))
+    # Called from inside an event loop (e.g. AsyncGmailClient), so run the
+    # callback server on its own loop in a worker thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, _receive_auth_code(auth_url, timeout)).result()
+
+def _save_token(creds, path):
+    """Write credentials to the token file atomically, readable only by the user"""
+    tmp_path = path + '.tmp'
+    try:
+        # Writers hold an advisory lock for the whole write-and-rename, so
+        # concurrent processes cannot rename a temp file another is writing
+        lock_fd = os.open(path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(lock_fd, msvcrt.LK_LOCK, 1)
+            try:
+                fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, 'w') as token:
+                    token.write(creds.to_json())
+                    token.flush()
+                    os.fsync(token.fileno())
+                os.replace(tmp_path, path)
+            finally:
+                # flock locks go with the descriptor; msvcrt regions must be
+                # unlocked explicitly before it is closed
+                if not fcntl:
+                    msvcrt.locking(lock_fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(lock_fd)
+    except OSError as e:
+        logger.warning("Failed to save token to %s: %s", path, e)
+
+def _is_stale(creds):
+    """Check whether valid credentials are inside the pre-expiry refresh window"""
+    if not creds.refresh_token or creds.expiry is None:
+        return False
+    # google-auth keeps expiry as a naive UTC datetime
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return creds.expiry - now < TOKEN_REFRESH_WINDOW
+
+def _refresh_in_background(creds, token_file):
+    """Refresh stale credentials on a daemon thread, at most one refresh at a time"""
+    with _refresh_lock:
+        if _refreshing.is_set():
+            return
+        _refreshing.set()
+    
+    def refresh():
+        try:
+            # Refresh a copy so callers never see a half-updated token
+            fresh = Credentials.from_authorized_user_info(json.loads(creds.to_json()))
+            fresh.refresh(Request())
+            creds.token, creds.expiry = fresh.token, fresh.expiry
+            _save_token(creds, token_file)
+        except (RefreshError, TransportError, OSError) as e:
+            logger.warning("Failed to refresh token in background: %s", e)
+        finally:
+            _refreshing.clear()
+    
+    threading.Thread(target=refresh, daemon=True).start()
+
+def _refresh_if_stale(creds):
+    """Start a background refresh when still-valid credentials are about to expire"""
+    if creds.valid and _is_stale(creds):
+        _refresh_in_background(creds, TOKEN_FILE)
+
+def refresh_service_if_stale(service):
+    """
+    Keep a long-lived service from get_gmail_service() ahead of token expiry;
+    call before reusing it so requests never wait on a refresh
+    """
+    _refresh_if_stale(service._http.credentials)
 
 def get_credentials():
     """Get valid Gmail API credentials"""
     creds = None
-    token_file = 'gmail_token.json'
-    credentials_file = 'gmail_credentials.json'
+    token_file = TOKEN_FILE
+    credentials_file = CREDENTIALS_FILE
     
     # Check if token file exists and load it
     if os.path.exists(token_file):
         creds = Credentials.from_authorized_user_file(token_file)
     
+    if creds and creds.valid and _is_stale(creds):
+        _refresh_in_background(creds, token_file)
+    
     # If there are no (valid) credentials available, let the user log in
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
             try:
                 creds.refresh(Request())
-            except Exception as e:
-                print(f"Failed to refresh token: {e}")
+            except (RefreshError, TransportError) as e:
+                logger.warning("Failed to refresh token: %s", e)
                 creds = None
+            else:
+                _save_token(creds, token_file)
         
         if not creds:
             if not os.path.exists(credentials_file):
@@ -93,63 +302,51 @@ def get_credentials():
                 )
             
             # Start the OAuth flow
-            flow = Flow.from_client_secrets_file(
-                credentials_file,
-                scopes=['https://www.googleapis.com/auth/gmail.readonly',
-                       'https://www.googleapis.com/auth/gmail.send',
-                       'https://www.googleapis.com/auth/gmail.modify']            )
-              # Set up the redirect URI to match Google Cloud Console configuration
-            redirect_uri = 'http://localhost:5000/oauth2callback'
-            flow.redirect_uri = redirect_uri
-            
-            # Start a local server to handle the OAuth callback
-            global auth_code
-            auth_code = None
-            
-            server = HTTPServer(('localhost', 5000), AuthCodeHandler)
-            server_thread = threading.Thread(target=server.serve_forever)
-            server_thread.daemon = True
-            server_thread.start()
+            flow = Flow.from_client_config(_load_client_config(credentials_file), scopes=SCOPES)
+            flow.redirect_uri = OAUTH_REDIRECT_URI
             
-            # Get the authorization URL
+            # Get the authorization URL and wait for the local callback to deliver the code
             auth_url, _ = flow.authorization_url(prompt='consent')
-            
-            print(f"Opening browser for Gmail authentication...")
-            print(f"If the browser doesn't open automatically, visit: {auth_url}")
-            
-            # Open the authorization URL in the default browser
-            webbrowser.open(auth_url)
-            
-            # Wait for the authorization code
-            print("Waiting for authorization...")
-            timeout = 120  # 2 minutes timeout
-            start_time = time.time()
-            
-            while auth_code is None and (time.time() - start_time) < timeout:
-                time.sleep(1)
-            
-            server.shutdown()
-            
-            if auth_code is None:
-                raise TimeoutError("Authorization timed out")
+            auth_code = _wait_for_auth_code(auth_url)
             
             # Exchange the authorization code for credentials
             flow.fetch_token(code=auth_code)
             creds = flow.credentials
             
             # Save the credentials for the next run
-            with open(token_file, 'w') as token:
-                token.write(creds.to_json())
+            _save_token(creds, token_file)
             
             print("Gmail authentication successful!")
     
     return creds
 
+@lru_cache(maxsize=None)
+def _load_client_config(credentials_file):
+    """Parse the OAuth client secrets file once per process"""
+    with open(credentials_file, 'r') as f:
+        return json.load(f)
+
 def get_gmail_service():
-    """Get Gmail API service object"""
-    creds = get_credentials()
-    service = build('gmail', 'v1', credentials=creds)
-    return service
+    """Get Gmail API service object, reusing the one built for the current token"""
+    with _SERVICE_LOCK:
+        cached = _SERVICE_CACHE.get(TOKEN_FILE)
+        # The service's authorized HTTP refreshes expired tokens by itself,
+        # so the cached service stays usable as long as it can refresh
+        if cached and (cached[0].valid or cached[0].refresh_token):
+            _refresh_if_stale(cached[0])
+            return cached[1]
+        
+        creds = get_credentials()
+        # The Gmail v1 discovery document ships with google-api-python-client 2.x,
+        # so building the service needs no request to the discovery endpoint
+        service = build(
+            'gmail', 'v1',
+            http=AuthorizedHttp(creds, http=_HTTP),
+            cache_discovery=False,
+            static_discovery=True
+        )
+        _SERVICE_CACHE[TOKEN_FILE] = (creds, service)
+        return service
 
 def list_messages(service, query='', max_results=10, label_ids=None):
     """List Gmail messages"""
@@ -157,109 +354,270 @@ def list_messages(service, query='', max_results=10, label_ids=None):
         kwargs = {
             'userId': 'me',
             'q': query,
-            'maxResults': max_results
+            'maxResults': max_results,
+            'fields': LIST_FIELDS
         }
         
         if label_ids:
             kwargs['labelIds'] = label_ids
             
-        result = service.users().messages().list(**kwargs).execute()
+        result = service.users().messages().list(**kwargs).execute(num_retries=API_NUM_RETRIES)
         messages = result.get('messages', [])
         
         # Get detailed message info
-        detailed_messages = []
-        for message in messages:
-            msg_detail = service.users().messages().get(
-                userId='me', 
-                id=message['id'],
-                format='metadata',
-                metadataHeaders=['Subject', 'From', 'To', 'Date']
-            ).execute()
-            
-            headers = {h['name']: h['value'] for h in msg_detail['payload']['headers']}
-            
-            detailed_messages.append({
-                'id': message['id'],
-                'threadId': message['threadId'],
-                'subject': headers.get('Subject', ''),
-                'from': headers.get('From', ''),
-                'to': headers.get('To', ''),
-                'date': headers.get('Date', ''),
-                'snippet': msg_detail.get('snippet', ''),
-                'labelIds': msg_detail.get('labelIds', [])
-            })
-        
-        return detailed_messages
-    except Exception as e:
-        print(f"Error listing messages: {e}")
-        return []
+        details = get_message_metadata(service, [message['id'] for message in messages])
+        return [
+            _summarize_metadata(details[message['id']])
+            for message in messages if message['id'] in details
+        ]
+    except HttpError as e:
+        logger.error("Error listing messages: %s", e)
+        raise
+
+def _collect_headers(headers, wanted):
+    """Pick the wanted headers (lowercase names) in one pass, stopping once all are found"""
+    found = {}
+    for header in headers:
+        name = header['name'].lower()
+        if name in wanted and name not in found:
+            found[name] = header['value']
+            if len(found) == len(wanted):
+                break
+    return found
+
+def _summarize_metadata(msg_detail):
+    """Build a message summary from a metadata-format message resource"""
+    headers = _collect_headers(msg_detail['payload']['headers'], SUMMARY_HEADERS)
+    return {
+        'id': msg_detail['id'],
+        'threadId': msg_detail['threadId'],
+        'subject': headers.get('subject', ''),
+        'from': headers.get('from', ''),
+        'to': headers.get('to', ''),
+        'date': headers.get('date', ''),
+        'snippet': msg_detail.get('snippet', ''),
+        'labelIds': msg_detail.get('labelIds', [])
+    }
+
+def _metadata_request(service, message_id):
+    """Build a metadata-format get request for a message"""
+    return service.users().messages().get(
+        userId='me',
+        id=message_id,
+        format='metadata',
+        metadataHeaders=METADATA_HEADERS,
+        fields=METADATA_FIELDS
+    )
+
+def _full_request(service, message_id):
+    """Build a full-format get request for a message"""
+    return service.users().messages().get(
+        userId='me',
+        id=message_id,
+        format='full'
+    )
+
+def get_message_metadata(service, message_ids):
+    """Get metadata for several messages using Gmail batch requests"""
+    return _batch_get(service, message_ids, _metadata_request)
+
+def get_raw_messages(service, message_ids):
+    """Get several Gmail message resources in 'full' format using Gmail batch requests"""
+    return _batch_get(service, message_ids, _full_request)
+
+def _batch_get(service, message_ids, build_request):
+    """Execute the get requests built for each message in batches, keyed by message ID"""
+    details = {}
+    failed_ids = []
+    
+    def collect(request_id, response, exception):
+        if exception is not None:
+            failed_ids.append(request_id)
+        else:
+            details[request_id] = response
+    
+    for start in range(0, len(message_ids), GMAIL_BATCH_SIZE):
+        chunk = message_ids[start:start + GMAIL_BATCH_SIZE]
+        batch = service.new_batch_http_request(callback=collect)
+        for message_id in chunk:
+            batch.add(build_request(service, message_id), request_id=message_id)
+        try:
+            batch.execute()
+        except HttpError as e:
+            logger.warning("Batch request failed, fetching messages individually: %s", e)
+            failed_ids.extend(chunk)
+    
+    # Parts of a batch can fail on their own (e.g. rate limits), so fetch those individually
+    retry_ids = [message_id for message_id in dict.fromkeys(failed_ids) if message_id not in details]
+    if retry_ids:
+        _fetch_parallel(service, retry_ids, build_request, details)
+    
+    return details
+
+def _fetch_parallel(service, message_ids, build_request, details):
+    """Fetch messages with one request per message, spread over worker threads"""
+    def fetch(message_id):
+        try:
+            return build_request(service, message_id).execute(num_retries=API_NUM_RETRIES)
+        except HttpError as e:
+            logger.error("Error getting message %s: %s", message_id, e)
+            return None
+    
+    with ThreadPoolExecutor(max_workers=min(DETAIL_FETCH_WORKERS, len(message_ids))) as executor:
+        for message_id, detail in zip(message_ids, executor.map(fetch, message_ids)):
+            if detail is not None:
+                details[message_id] = detail
+
+def _cache_get_message(message_id):
+    """Return a copy of a cached message, or None if absent or expired"""
+    with _message_cache_lock:
+        cached = _message_cache.get(message_id)
+        if cached is None:
+            return None
+        if cached[0] <= time.monotonic():
+            del _message_cache[message_id]
+            return None
+        _message_cache.move_to_end(message_id)
+        message = cached[1]
+    return {**message, 'labelIds': list(message['labelIds'])}
+
+def _cache_put_message(message):
+    """Store a message, evicting the least recently used entry when full"""
+    with _message_cache_lock:
+        _message_cache[message['id']] = (time.monotonic() + MESSAGE_CACHE_TTL, message)
+        _message_cache.move_to_end(message['id'])
+        if len(_message_cache) > MESSAGE_CACHE_SIZE:
+            _message_cache.popitem(last=False)
+
+def _invalidate_message(message_id):
+    """Drop a message whose labels have changed"""
+    with _message_cache_lock:
+        _message_cache.pop(message_id, None)
+
+def clear_cache():
+    """Empty the get_message cache"""
+    with _message_cache_lock:
+        _message_cache.clear()
+
+# Base64 characters decoded per chunk by iter_body_chunks (a multiple of 4)
+BODY_CHUNK_CHARS = 64 * 1024
+
+def _find_text_plain(payload):
+    """Find the body of the first text/plain part, searching nested multiparts depth-first"""
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        body = part.get('body', {})
+        # Large parts carry an attachmentId instead of inline data
+        if part.get('mimeType') == 'text/plain' and ('data' in body or 'attachmentId' in body):
+            return body
+        # Reversed so parts are visited in document order
+        stack.extend(reversed(part.get('parts', ())))
+    return None
+
+def _text_plain_data(service, message):
+    """Get the base64url text/plain body of a message, fetching it separately if it was not inlined"""
+    body = _find_text_plain(message['payload'])
+    if body is None:
+        return None
+    if 'data' in body:
+        return body['data']
+    attachment = service.users().messages().attachments().get(
+        userId='me',
+        messageId=message['id'],
+        id=body['attachmentId']
+    ).execute(num_retries=API_NUM_RETRIES)
+    return attachment.get('data')
+
+def iter_body_chunks(service, message_id, chunk_chars=BODY_CHUNK_CHARS):
+    """Yield the decoded text/plain body of a message in chunks, e.g. for streaming to disk"""
+    message = service.users().messages().get(
+        userId='me',
+        id=message_id,
+        format='full'
+    ).execute(num_retries=API_NUM_RETRIES)
+    data = _text_plain_data(service, message)
+    if not data:
+        return
+    for start in range(0, len(data), chunk_chars):
+        chunk = data[start:start + chunk_chars]
+        # Only the last chunk can be short, and Gmail may leave out its padding
+        yield b64.urlsafe_b64decode((chunk + '=' * (-len(chunk) % 4)).encode('ascii'))
+
+def _parse_full_message(message, data=None):
+    """Build the get_message result from a full-format message resource and its base64url body"""
+    payload = message['payload']
+    headers = _collect_headers(payload['headers'], SUMMARY_HEADERS)
+    
+    # Extract message body
+    body = ''
+    if data:
+        body = b64.urlsafe_b64decode(data.encode('ascii')).decode('utf-8', errors='replace')
+    
+    return {
+        'id': message['id'],
+        'threadId': message['threadId'],
+        'subject': headers.get('subject', ''),
+        'from': headers.get('from', ''),
+        'to': headers.get('to', ''),
+        'date': headers.get('date', ''),
+        'body': body,
+        'snippet': message.get('snippet', ''),
+        'labelIds': message.get('labelIds', [])
+    }
 
 def get_message(service, message_id):
     """Get a specific Gmail message"""
+    cached = _cache_get_message(message_id)
+    if cached is not None:
+        return cached
+    
     try:
-        message = service.users().messages().get(
-            userId='me', 
-            id=message_id,
-            format='full'
-        ).execute()
-        
-        payload = message['payload']
-        headers = {h['name']: h['value'] for h in payload['headers']}
-        
-        # Extract message body
-        body = ''
-        if 'parts' in payload:
-            for part in payload['parts']:
-                if part['mimeType'] == 'text/plain':
-                    if 'data' in part['body']:
-                        body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-                        break
-        else:
-            if payload['mimeType'] == 'text/plain' and 'data' in payload['body']:
-                body = base64.urlsafe_b64decode(payload['body']['data']).decode('utf-8')
-        
-        return {
-            'id': message['id'],
-            'threadId': message['threadId'],
-            'subject': headers.get('Subject', ''),
-            'from': headers.get('From', ''),
-            'to': headers.get('To', ''),
-            'date': headers.get('Date', ''),
-            'body': body,
-            'snippet': message.get('snippet', ''),
-            'labelIds': message.get('labelIds', [])
-        }
-    except Exception as e:
-        print(f"Error getting message: {e}")
-        return None
+        message = _full_request(service, message_id).execute(num_retries=API_NUM_RETRIES)
+        result = _parse_full_message(message, _text_plain_data(service, message))
+    except HttpError as e:
+        logger.error("Error getting message %s: %s", message_id, e)
+        raise
+    
+    _cache_put_message(result)
+    return {**result, 'labelIds': list(result['labelIds'])}
+
+def get_raw_message(service, message_id):
+    """Get a Gmail message resource in 'full' format, including its MIME payload"""
+    try:
+        return _full_request(service, message_id).execute(num_retries=API_NUM_RETRIES)
+    except HttpError as e:
+        logger.error("Error getting message %s: %s", message_id, e)
+        raise
+
+def _build_raw_message(to, subject, body, cc=None, bcc=None):
+    """Build a new email as a base64url encoded RFC 5322 message"""
+    # The email package encodes non-ASCII headers and bodies, and Gmail
+    # fills in From, Date and Message-ID on send
+    message = EmailMessage(policy=policy.SMTP)
+    message['To'] = to
+    message['Subject'] = subject
+    if cc:
+        message['Cc'] = cc
+    if bcc:
+        message['Bcc'] = bcc
+    message.set_content(body)
+    return b64.urlsafe_b64encode(message.as_bytes()).decode()
 
 def send_message(service, to, subject, body, cc=None, bcc=None):
     """Send an email"""
     try:
-        # Create email message
-        message_text = f"""To: {to}
-Subject: {subject}
-"""
-        if cc:
-            message_text += f"Cc: {cc}\n"
-        if bcc:
-            message_text += f"Bcc: {bcc}\n"
-        
-        message_text += f"\n{body}"
-        
-        raw_message = base64.urlsafe_b64encode(message_text.encode()).decode()
-        
-        send_message_body = {'raw': raw_message}
+        send_message_body = {'raw': _build_raw_message(to, subject, body, cc, bcc)}
         
         result = service.users().messages().send(
             userId='me',
             body=send_message_body
-        ).execute()
+        ).execute(num_retries=API_NUM_RETRIES)
         
         return result
-    except Exception as e:
-        print(f"Error sending message: {e}")
-        return None
+    except HttpError as e:
+        logger.error("Error sending message: %s", e)
+        raise
 
 def reply_to_message(service, message_id, reply_body):
     """Reply to a specific message"""
@@ -269,20 +627,23 @@ def reply_to_message(service, message_id, reply_body):
             userId='me',
             id=message_id,
             format='metadata',
-            metadataHeaders=['Subject', 'From', 'To', 'Message-ID']
-        ).execute()
+            metadataHeaders=['Subject', 'From', 'To', 'Message-ID', 'References']
+        ).execute(num_retries=API_NUM_RETRIES)
         
-        headers = {h['name']: h['value'] for h in original_message['payload']['headers']}
+        # Header name case varies between senders (Message-ID vs Message-Id)
+        headers = _collect_headers(original_message['payload']['headers'], REPLY_HEADERS)
+        original_id = headers.get('message-id', '')
         
         # Create reply message
-        reply_text = f"""To: {headers.get('From', '')}
-Subject: Re: {headers.get('Subject', '').replace('Re: ', '')}
-In-Reply-To: {headers.get('Message-ID', '')}
-References: {headers.get('Message-ID', '')}
-
-{reply_body}"""
+        reply = EmailMessage(policy=policy.SMTP)
+        reply['To'] = headers.get('from', '')
+        reply['Subject'] = 'Re: ' + REPLY_PREFIX.sub('', headers.get('subject', ''))
+        if original_id:
+            reply['In-Reply-To'] = original_id
+            reply['References'] = f"{headers['references']} {original_id}" if headers.get('references') else original_id
+        reply.set_content(reply_body)
         
-        raw_message = base64.urlsafe_b64encode(reply_text.encode()).decode()
+        raw_message = b64.urlsafe_b64encode(reply.as_bytes()).decode()
         
         send_message_body = {
             'raw': raw_message,
@@ -292,17 +653,17 @@ References: {headers.get('Message-ID', '')}
         result = service.users().messages().send(
             userId='me',
             body=send_message_body
-        ).execute()
+        ).execute(num_retries=API_NUM_RETRIES)
         
         return result
-    except Exception as e:
-        print(f"Error replying to message: {e}")
-        return None
+    except HttpError as e:
+        logger.error("Error replying to message %s: %s", message_id, e)
+        raise
 
 def get_labels(service):
     """Get Gmail labels"""
     try:
-        result = service.users().labels().list(userId='me').execute()
+        result = service.users().labels().list(userId='me').execute(num_retries=API_NUM_RETRIES)
         labels = result.get('labels', [])
         
         return [{
@@ -310,9 +671,9 @@ def get_labels(service):
             'name': label['name'],
             'type': label['type']
         } for label in labels]
-    except Exception as e:
-        print(f"Error getting labels: {e}")
-        return []
+    except HttpError as e:
+        logger.error("Error getting labels: %s", e)
+        raise
 
 def add_label_to_message(service, message_id, label_id):
     """Add a label to a message"""
@@ -321,11 +682,15 @@ def add_label_to_message(service, message_id, label_id):
             userId='me',
             id=message_id,
             body={'addLabelIds': [label_id]}
-        ).execute()
+        ).execute(num_retries=API_NUM_RETRIES)
         return result
-    except Exception as e:
-        print(f"Error adding label to message: {e}")
-        return None
+    except HttpError as e:
+        logger.error("Error adding label %s to message %s: %s", label_id, message_id, e)
+        raise
+    finally:
+        # Evicted once the call is over, so a get_message that ran meanwhile
+        # cannot re-cache the old labels
+        _invalidate_message(message_id)
 
 def remove_label_from_message(service, message_id, label_id):
     """Remove a label from a message"""
@@ -334,11 +699,57 @@ def remove_label_from_message(service, message_id, label_id):
             userId='me',
             id=message_id,
             body={'removeLabelIds': [label_id]}
-        ).execute()
+        ).execute(num_retries=API_NUM_RETRIES)
         return result
-    except Exception as e:
-        print(f"Error removing label from message: {e}")
-        return None
+    except HttpError as e:
+        logger.error("Error removing label %s from message %s: %s", label_id, message_id, e)
+        raise
+    finally:
+        _invalidate_message(message_id)
+
+# messages.batchModify accepts at most 1000 message ids per request
+BATCH_MODIFY_LIMIT = 1000
+
+def _batch_modify(service, message_ids, add_label_ids=None, remove_label_ids=None):
+    """Change labels on many messages with batchModify, returning the ids that were modified"""
+    body = {}
+    if add_label_ids:
+        body['addLabelIds'] = add_label_ids
+    if remove_label_ids:
+        body['removeLabelIds'] = remove_label_ids
+    
+    modified = []
+    for start in range(0, len(message_ids), BATCH_MODIFY_LIMIT):
+        chunk = message_ids[start:start + BATCH_MODIFY_LIMIT]
+        try:
+            service.users().messages().batchModify(
+                userId='me',
+                body={'ids': chunk, **body}
+            ).execute(num_retries=API_NUM_RETRIES)
+        except HttpError as e:
+            logger.error("Error modifying labels for %d messages: %s", len(chunk), e)
+            break
+        finally:
+            for message_id in chunk:
+                _invalidate_message(message_id)
+        modified.extend(chunk)
+    return modified
+
+def add_label_to_messages(service, message_ids, label_id):
+    """Add a label to several messages in one request per 1000 messages"""
+    return _batch_modify(service, message_ids, add_label_ids=[label_id])
+
+def remove_label_from_messages(service, message_ids, label_id):
+    """Remove a label from several messages in one request per 1000 messages"""
+    return _batch_modify(service, message_ids, remove_label_ids=[label_id])
+
+def mark_as_read_bulk(service, message_ids):
+    """Mark several messages as read"""
+    return remove_label_from_messages(service, message_ids, 'UNREAD')
+
+def mark_as_unread_bulk(service, message_ids):
+    """Mark several messages as unread"""
+    return add_label_to_messages(service, message_ids, 'UNREAD')
 
 def mark_as_read(service, message_id):
     """Mark a message as read"""
@@ -351,3 +762,188 @@ def mark_as_unread(service, message_id):
 def search_messages(service, query, max_results=10):
     """Search Gmail messages with a query"""
     return list_messages(service, query=query, max_results=max_results)
+
+GMAIL_API_URL = 'https://gmail.googleapis.com/gmail/v1/users/me/'
+# Gmail limits concurrent requests per user, so the async client keeps at most
+# this many in flight; a listing's metadata fetches queue behind it
+ASYNC_MAX_CONCURRENT_REQUESTS = 10
+# Statuses the async client retries for idempotent requests, as the sync path
+# does through num_retries, backing off or waiting out Retry-After
+ASYNC_RETRY_STATUSES = frozenset((429, 500, 503))
+
+class AsyncGmailClient:
+    """
+    Async Gmail client on the REST API, for fanning out many mailbox
+    operations concurrently over one pooled httpx connection.
+    
+    Results match the module-level functions; HTTP errors are raised as
+    httpx.HTTPStatusError. Use it as an async context manager, or call aclose().
+    """
+    
+    def __init__(self, creds=None, max_connections=100):
+        self.creds = creds or get_credentials()
+        self._refresh_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(ASYNC_MAX_CONCURRENT_REQUESTS)
+        self._client = httpx.AsyncClient(
+            base_url=GMAIL_API_URL,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=20),
+            timeout=30.0
+        )
+    
+    @classmethod
+    def for_service(cls, service, **kwargs):
+        """Create a client sharing the credentials of a service from get_gmail_service()"""
+        return cls(creds=service._http.credentials, **kwargs)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+    
+    async def aclose(self):
+        """Close the underlying connection pool"""
+        await self._client.aclose()
+    
+    async def _auth_headers(self):
+        """Get the Authorization header, refreshing the token off the event loop if needed"""
+        if not self.creds.valid:
+            async with self._refresh_lock:
+                if not self.creds.valid:
+                    await asyncio.to_thread(self.creds.refresh, Request())
+                    await asyncio.to_thread(_save_token, self.creds, TOKEN_FILE)
+        else:
+            _refresh_if_stale(self.creds)
+        return {'Authorization': f'Bearer {self.creds.token}'}
+    
+    async def _request(self, method, path, idempotent=None, **kwargs):
+        """
+        Send an authorized request and return the decoded JSON body. Idempotent
+        requests (GETs unless told otherwise) are retried on 429/500/503 up to
+        API_NUM_RETRIES times.
+        """
+        if idempotent is None:
+            idempotent = method == 'GET'
+        attempts = API_NUM_RETRIES + 1 if idempotent else 1
+        for attempt in range(attempts):
+            async with self._semaphore:
+                response = await self._client.request(method, path, headers=await self._auth_headers(), **kwargs)
+            if response.status_code not in ASYNC_RETRY_STATUSES or attempt == attempts - 1:
+                break
+            retry_after = response.headers.get('Retry-After', '')
+            delay = float(retry_after) if retry_after.isdigit() else (2 ** attempt) * (0.5 + random.random())
+            logger.warning("Gmail returned %s for %s %s, retrying in %.1fs", response.status_code, method, path, delay)
+            await asyncio.sleep(delay)
+        response.raise_for_status()
+        return response.json() if response.content else {}
+    
+    async def list_messages(self, query='', max_results=10, label_ids=None):
+        """List Gmail messages, fetching their metadata concurrently"""
+        params = {'q': query, 'maxResults': max_results, 'fields': LIST_FIELDS}
+        if label_ids:
+            params['labelIds'] = label_ids
+        result = await self._request('GET', 'messages', params=params)
+        message_ids = [message['id'] for message in result.get('messages', [])]
+        
+        details = await asyncio.gather(*(
+            self._request('GET', f"messages/{message_id}",
+                          params={'format': 'metadata', 'metadataHeaders': METADATA_HEADERS,
+                                  'fields': METADATA_FIELDS})
+            for message_id in message_ids
+        ), return_exceptions=True)
+        
+        # As in the sync path, a message that cannot be fetched is left out
+        # rather than failing the whole listing
+        summaries = []
+        for message_id, detail in zip(message_ids, details):
+            if isinstance(detail, httpx.HTTPStatusError):
+                if detail.response.status_code == 404:
+                    # Deleted between the list call and the get
+                    logger.debug("Message %s no longer exists", message_id)
+                else:
+                    logger.error("Error getting message %s: %s", message_id, detail)
+            elif isinstance(detail, BaseException):
+                raise detail
+            else:
+                summaries.append(_summarize_metadata(detail))
+        return summaries
+    
+    async def search_messages(self, query, max_results=10):
+        """Search Gmail messages with a query"""
+        return await self.list_messages(query=query, max_results=max_results)
+    
+    async def get_message(self, message_id):
+        """Get a specific Gmail message, sharing the get_message cache"""
+        cached = _cache_get_message(message_id)
+        if cached is not None:
+            return cached
+        
+        message = await self._request('GET', f'messages/{message_id}', params={'format': 'full'})
+        body = _find_text_plain(message['payload'])
+        data = body.get('data') if body else None
+        if body and data is None:
+            attachment = await self._request('GET', f"messages/{message_id}/attachments/{body['attachmentId']}")
+            data = attachment.get('data')
+        result = _parse_full_message(message, data)
+        _cache_put_message(result)
+        return {**result, 'labelIds': list(result['labelIds'])}
+    
+    async def get_raw_message(self, message_id):
+        """Get a Gmail message resource in 'full' format, including its MIME payload"""
+        return await self._request('GET', f'messages/{message_id}', params={'format': 'full'})
+    
+    async def send_message(self, to, subject, body, cc=None, bcc=None):
+        """Send an email"""
+        return await self._request('POST', 'messages/send', json={'raw': _build_raw_message(to, subject, body, cc, bcc)})
+    
+    async def modify_labels(self, message_id, add_label_ids=None, remove_label_ids=None):
+        """Add and/or remove labels on a message, returning the updated message resource"""
+        body = {}
+        if add_label_ids:
+            body['addLabelIds'] = add_label_ids
+        if remove_label_ids:
+            body['removeLabelIds'] = remove_label_ids
+        try:
+            return await self._request('POST', f'messages/{message_id}/modify', idempotent=True, json=body)
+        finally:
+            _invalidate_message(message_id)
+    
+    async def batch_modify(self, message_ids, add_label_ids=None, remove_label_ids=None):
+        """Change labels on many messages, one request per 1000 ids"""
+        body = {}
+        if add_label_ids:
+            body['addLabelIds'] = add_label_ids
+        if remove_label_ids:
+            body['removeLabelIds'] = remove_label_ids
+        for start in range(0, len(message_ids), BATCH_MODIFY_LIMIT):
+            chunk = message_ids[start:start + BATCH_MODIFY_LIMIT]
+            try:
+                await self._request('POST', 'messages/batchModify', idempotent=True, json={'ids': chunk, **body})
+            finally:
+                for message_id in chunk:
+                    _invalidate_message(message_id)
+    
+    async def add_label_to_message(self, message_id, label_id):
+        """Add a label to a message"""
+        return await self.modify_labels(message_id, add_label_ids=[label_id])
+    
+    async def remove_label_from_message(self, message_id, label_id):
+        """Remove a label from a message"""
+        return await self.modify_labels(message_id, remove_label_ids=[label_id])
+    
+    async def mark_as_read(self, message_id):
+        """Mark a message as read"""
+        return await self.remove_label_from_message(message_id, 'UNREAD')
+    
+    async def mark_as_unread(self, message_id):
+        """Mark a message as unread"""
+        return await self.add_label_to_message(message_id, 'UNREAD')
+    
+    async def get_labels(self):
+        """Get Gmail labels"""
+        result = await self._request('GET', 'labels')
+        return [{
+            'id': label['id'],
+            'name': label['name'],
+            'type': label['type']
+        } for label in result.get('labels', [])]
@@ -7,12 +7,39 @@ and managing Gmail messages and labels, utilizing the gmail_lib module.
 """
 
 import asyncio
-import base64
+import atexit
 import os
-from typing import List, Optional, Dict, Any
+import re
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Tuple
+
+try:
+    # SIMD-accelerated drop-in replacement for the base64 module
+    import pybase64 as b64
+except ImportError:
+    import base64 as b64
+
+if hasattr(b64, 'b64decode_as_bytearray'):
+    # pybase64 maps the URL-safe alphabet while decoding straight into a
+    # bytearray, with no translated copy of the input
+    def _b64url_decode(data: str) -> bytearray:
+        return b64.b64decode_as_bytearray(data, altchars=b'-_')
+else:
+    _b64url_decode = b64.urlsafe_b64decode
+
+import orjson
+try:
+    # Statistical charset detection for bodies that mislabel their encoding
+    from charset_normalizer import from_bytes as _detect_charset
+except ImportError:
+    _detect_charset = None
 
 from fastmcp import FastMCP, Context
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 import gmail_lib
 
 # --- Server Configuration ---
@@ -23,32 +50,80 @@ MCP_HOST = "127.0.0.1" # Default host
 CREDENTIALS_FILE = 'gmail_credentials.json'
 SCOPES = ['https://www.googleapis.com/auth/gmail.modify'] #.modify includes read, send, compose, labels
 
+# json.dumps, which FastMCP used before, writes int/float/bool/None dict
+# keys as strings; orjson rejects them unless told to do the same
+_SERIALIZE_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+def _serialize_result(data: Any) -> str:
+    """Serializes tool results to JSON text with orjson. A value orjson cannot
+    serialize raises instead of being sent as its repr."""
+    return orjson.dumps(data, option=_SERIALIZE_OPTIONS).decode('utf-8')
+
 # Initialize FastMCP
 mcp = FastMCP(
     name=SERVER_NAME,
     version=SERVER_VERSION,
-    description="A Model Context Protocol server for Gmail API functionality."
+    description="A Model Context Protocol server for Gmail API functionality.",
+    tool_serializer=_serialize_result
 )
 
 # Global variable to store the Gmail API service client
 gmail_service = None
+# Async REST client sharing the service's credentials. Plain request/response
+# calls go through it directly; batch requests and replies still use the service
+gmail_client: Optional[gmail_lib.AsyncGmailClient] = None
+# Held while the service is being initialized, so concurrent first calls share
+# one authentication instead of each starting their own
+_service_init_lock = asyncio.Lock()
+
+# Gmail API calls are blocking, so they run on a dedicated, bounded pool
+# rather than asyncio's default executor, which is sized by CPU count
+GMAIL_EXECUTOR_WORKERS = 8
+_EXECUTOR = ThreadPoolExecutor(max_workers=GMAIL_EXECUTOR_WORKERS, thread_name_prefix="gmail")
+atexit.register(_EXECUTOR.shutdown, wait=False)
+
+# Formatted message details by message ID, as (expiry, message). Content never
+# changes; labels are kept current for changes made through this server, and
+# the TTL bounds how stale labels changed elsewhere (e.g. in the Gmail UI) can get
+MESSAGE_CACHE_SIZE = 512
+MESSAGE_CACHE_TTL = 300
+_message_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_message_cache_lock = asyncio.Lock()
+
+# The user's labels, as (expiry, labels). Labels change at human rates, so the
+# listing is reused for a minute; the lock lets concurrent misses share one fetch
+LABELS_CACHE_TTL = 60
+_labels_cache: Optional[tuple] = None
+_labels_cache_lock = asyncio.Lock()
 
 # --- Helper Functions ---
 
+async def _run_blocking(func, *args):
+    """Runs a blocking gmail_lib call on the shared Gmail executor."""
+    return await asyncio.get_running_loop().run_in_executor(_EXECUTOR, func, *args)
+
 async def _ensure_service(ctx: Context):
     """
     Ensures the Gmail service is initialized.
     Returns True if service is available, False otherwise.
     """
-    global gmail_service
-    if gmail_service is None:
+    global gmail_service, gmail_client
+    if gmail_service is not None:
+        gmail_lib.refresh_service_if_stale(gmail_service)
+        return True
+    async with _service_init_lock:
+        if gmail_service is not None:
+            # Initialized by a call that held the lock before this one
+            return True
         await ctx.info("Gmail service not initialized. Attempting to authenticate and initialize...")
         try:
             # Run synchronous gmail_lib.get_gmail_service in a separate thread
-            # to avoid blocking the asyncio event loop.
-            loop = asyncio.get_running_loop()
-            gmail_service = await loop.run_in_executor(None, gmail_lib.get_gmail_service)
+            # to avoid blocking the asyncio event loop. The service is built from
+            # the discovery document bundled with googleapiclient (static_discovery),
+            # so this costs no network round-trip beyond authentication.
+            gmail_service = await _run_blocking(gmail_lib.get_gmail_service)
             if gmail_service:
+                gmail_client = gmail_lib.AsyncGmailClient.for_service(gmail_service)
                 await ctx.info("✅ Gmail service initialized successfully.")
                 return True
             else:
@@ -63,163 +138,301 @@ async def _ensure_service(ctx: Context):
         except Exception as e:
             await ctx.error(f"❌ An unexpected error occurred during Gmail service initialization: {str(e)}")
             return False
-    return True
 
-def _get_header_value(headers: List[Dict[str, str]], name: str) -> str:
-    """Extracts a specific header value from a list of header dictionaries."""
-    for header in headers:
-        if header['name'].lower() == name.lower():
-            return header['value']
-    return ""
-
-def _decode_body_data(data: str) -> str:
-    """Decodes base64url encoded body data."""
+class _HeaderView:
+    """
+    Case-insensitive, read-only view over a message's header list. Lookups scan
+    the list on demand and remember what they found, so only the headers that
+    are actually read get indexed; as_dict() builds the full mapping when needed.
+    """
+    __slots__ = ('_list', '_cache')
+
+    def __init__(self, headers_list: List[Dict[str, str]]):
+        self._list = headers_list
+        self._cache: Dict[str, str] = {}
+
+    def get(self, name: str, default: str = '') -> str:
+        key = name.lower()
+        if key not in self._cache:
+            self._cache[key] = next((h['value'] for h in self._list if h['name'].lower() == key), default)
+        return self._cache[key]
+
+    def as_dict(self) -> Dict[str, str]:
+        """Maps the original-case header names, as sent by the API, to their values."""
+        return {h['name']: h['value'] for h in self._list}
+
+_CHARSET_PARAM = re.compile(r'charset\s*=\s*"?([^";\s]+)', re.IGNORECASE)
+
+def _part_charset(part: Dict[str, Any]) -> str:
+    """Returns the charset declared in a MIME part's Content-Type, defaulting to UTF-8."""
+    for header in part.get('headers', ()):
+        if header['name'].lower() == 'content-type':
+            match = _CHARSET_PARAM.search(header['value'])
+            if match:
+                return match.group(1)
+            break
+    return 'utf-8'
+
+def _decode_body_data(data: str, charset: str = 'utf-8') -> str:
+    """
+    Decodes base64url encoded body data as text in the part's declared charset.
+    Content that doesn't match its declaration is run through charset detection,
+    and failing that decoded as UTF-8 with replacement characters.
+    """
     if not data:
         return ""
+    # Pad up front so unpadded input decodes on the first attempt
+    data += '=' * (-len(data) % 4)
     try:
-        return base64.urlsafe_b64decode(data.encode('ASCII')).decode('utf-8')
-    except Exception:
-        # Fallback for data that might not be perfectly padded or encoded
-        try:
-            return base64.b64decode(data.replace('-', '+').replace('_', '/') + '===').decode('utf-8')
-        except Exception as e:
-            # If decoding fails, return a placeholder or the raw data, depending on desired behavior
-            # print(f"Warning: Could not decode body data: {e}") # For server-side logging
-            return "[Could not decode body content]"
-
-
-def _extract_body_from_payload(payload: Dict[str, Any], preferred_mime_type: str = "text/plain") -> str:
+        raw = _b64url_decode(data)
+    except ValueError:
+        # binascii.Error is a ValueError
+        return "[Could not decode body content]"
+    try:
+        # The decoded buffer is turned into text directly, without a bytes copy
+        return raw.decode(charset)
+    except (UnicodeDecodeError, LookupError):
+        pass
+    if _detect_charset is not None:
+        best = _detect_charset(bytes(raw)).best()
+        if best is not None:
+            return str(best)
+    return raw.decode('utf-8', 'replace')
+
+
+# Container types seen in practice, matched by hash lookup before the prefix check
+_MULTIPART_TYPES = frozenset((
+    'multipart/alternative', 'multipart/mixed', 'multipart/related',
+    'multipart/signed', 'multipart/report',
+))
+_BODY_TYPES = frozenset(('text/html', 'text/plain'))
+
+def _walk_payload(payload: Dict[str, Any]) -> Tuple[str, str, List[Dict[str, Any]]]:
     """
-    Extracts message body content from the payload.
-    Tries to find the preferred MIME type, then text/plain, then the first available text part.
+    Extracts the (html, text) bodies and the attachments of a message in one
+    breadth-first walk of its MIME tree. Each body is the first part of that type
+    found; when the message has no text/plain part, the text body falls back to
+    the first other text/* part (e.g. text/calendar).
     """
-    body_content = ""
-    if 'parts' in payload:
-        parts_to_check = payload['parts']
-        
-        # First pass for preferred_mime_type
-        for part in parts_to_check:
-            if part['mimeType'] == preferred_mime_type and part.get('body', {}).get('data'):
-                return _decode_body_data(part['body']['data'])
-            # Recurse for multipart/*
-            if part['mimeType'].startswith('multipart/') and 'parts' in part:
-                nested_body = _extract_body_from_payload(part, preferred_mime_type)
-                if nested_body:
-                    return nested_body
-        
-        # Second pass for text/plain if preferred was different
-        if preferred_mime_type != "text/plain":
-            for part in parts_to_check:
-                if part['mimeType'] == 'text/plain' and part.get('body', {}).get('data'):
-                    return _decode_body_data(part['body']['data'])
-                if part['mimeType'].startswith('multipart/') and 'parts' in part:
-                    nested_body = _extract_body_from_payload(part, "text/plain")
-                    if nested_body:
-                        return nested_body
-
-        # Third pass for any text/*
-        for part in parts_to_check:
-            if part['mimeType'].startswith('text/') and part.get('body', {}).get('data'):
-                return _decode_body_data(part['body']['data'])
-            if part['mimeType'].startswith('multipart/') and 'parts' in part: # Check nested again
-                nested_body = _extract_body_from_payload(part, part['mimeType']) # pass current mime
-                if nested_body: return nested_body
-
-
-    elif payload.get('mimeType', '').startswith('text/') and payload.get('body', {}).get('data'):
-        body_content = _decode_body_data(payload['body']['data'])
-    
-    return body_content
+    found: Dict[str, str] = {}
+    attachments: List[Dict[str, Any]] = []
+    queue = deque([payload])
+    while queue:
+        part = queue.popleft()
+        mime_type = part.get('mimeType', '')
+        if mime_type in _MULTIPART_TYPES or mime_type.startswith('multipart/'):
+            # Containers carry no content of their own
+            queue.extend(part.get('parts', ()))
+            continue
+        body = part.get('body', {})
+        if part.get('filename'):
+            # Parts with a filename are attachments, even when their content is inline
+            if body.get('attachmentId'):
+                attachments.append({
+                    "filename": part['filename'],
+                    "mimeType": mime_type,
+                    "size": body.get('size'),
+                    "attachmentId": body['attachmentId']
+                })
+        elif body.get('data') and mime_type.startswith('text/'):
+            key = mime_type if mime_type in _BODY_TYPES else 'text/*'
+            if key not in found:
+                found[key] = _decode_body_data(body['data'], _part_charset(part))
+        # Non-container parts can still nest, e.g. an attached message/rfc822
+        queue.extend(part.get('parts', ()))
+    return found.get('text/html', ''), found.get('text/plain') or found.get('text/*', ''), attachments
+
+
+@lru_cache(maxsize=2048)
+def _iso_date(raw_date: str) -> str:
+    """Converts an RFC 2822 Date header to ISO 8601, or '' when it can't be parsed."""
+    if not raw_date:
+        return ''
+    try:
+        return parsedate_to_datetime(raw_date).isoformat()
+    except (TypeError, ValueError):
+        return ''
 
-
-def _format_message_summary(message_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Formats a message for list views (summary)."""
-    # gmail_lib.list_messages already returns a good summary.
-    # This function can be used for consistency or minor adjustments if needed.
-    return {
-        "id": message_data.get('id'),
-        "threadId": message_data.get('threadId'),
-        "subject": message_data.get('subject', ''),
-        "from": message_data.get('from', ''),
-        "to": message_data.get('to', ''),
-        "date": message_data.get('date', ''),
-        "snippet": message_data.get('snippet', ''),
-        "labelIds": message_data.get('labelIds', [])
-    }
+def _add_iso_dates(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Adds 'isoDate' to message summaries, alongside their raw 'date'."""
+    for message in messages:
+        message['isoDate'] = _iso_date(message.get('date', ''))
+    return messages
 
 def _format_message_detail(message_data: Dict[str, Any]) -> Dict[str, Any]:
     """Formats a message for detailed view, including body."""
     payload = message_data.get('payload', {})
-    headers_list = payload.get('headers', [])
-    
-    headers_dict = {h['name']: h['value'] for h in headers_list}
+    headers = _HeaderView(payload.get('headers', []))
 
-    # Extract body - try HTML first, then plain text
-    body_html = _extract_body_from_payload(payload, 'text/html')
-    body_plain = _extract_body_from_payload(payload, 'text/plain')
+    # Extract body - try HTML first, then plain text - and basic attachment info
+    body_html, body_plain, attachments = _walk_payload(payload)
     
     body = body_html if body_html else body_plain
 
-    # Basic attachment info (name and ID if available)
-    attachments = []
-    if 'parts' in payload:
-        for part in payload['parts']:
-            if part.get('filename') and part.get('body', {}).get('attachmentId'):
-                attachments.append({
-                    "filename": part['filename'],
-                    "mimeType": part.get('mimeType'),
-                    "size": part.get('body', {}).get('size'),
-                    "attachmentId": part['body']['attachmentId'] 
-                })
-
     return {
         "id": message_data.get('id'),
         "threadId": message_data.get('threadId'),
-        "subject": headers_dict.get('Subject', ''),
-        "from": headers_dict.get('From', ''),
-        "to": headers_dict.get('To', ''),
-        "cc": headers_dict.get('Cc', ''),
-        "date": headers_dict.get('Date', ''),
+        "subject": headers.get('subject', ''),
+        "from": headers.get('from', ''),
+        "to": headers.get('to', ''),
+        "cc": headers.get('cc', ''),
+        "date": headers.get('date', ''),
+        # Canonical form of 'date' that sorts correctly as a string
+        "isoDate": _iso_date(headers.get('date', '')),
         "snippet": message_data.get('snippet', ''),
         "labelIds": message_data.get('labelIds', []),
-        "body": body, # This will be the plain text body from gmail_lib's get_message
-        "bodyHtml": body_html, # Attempt to get HTML body
-        "headers": headers_dict,        "attachments": attachments
+        "body": body, # HTML body when present, otherwise plain text
+        "bodyHtml": body_html, # Empty when the message has no HTML part
+        # Expanded into a dict by _prepare_message only when a caller asks for it
+        "headers": headers,
+        "attachments": attachments
     }
 
+async def _get_formatted_message(message_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the formatted detail of a message, from the cache when possible.
+    Callers get their own copy, so truncating it leaves the cached entry intact.
+    """
+    async with _message_cache_lock:
+        cached = _message_cache.get(message_id)
+        if cached and cached[0] > time.monotonic():
+            _message_cache.move_to_end(message_id)
+            return {**cached[1], "labelIds": list(cached[1]["labelIds"])}
+
+    # Fetch the 'full' message resource so the MIME payload can be formatted here
+    message_raw = await gmail_client.get_raw_message(message_id)
+    if not message_raw:
+        return None
+
+    formatted = _format_message_detail(message_raw)
+    async with _message_cache_lock:
+        _cache_formatted_message(formatted)
+    return {**formatted, "labelIds": list(formatted["labelIds"])}
+
+async def _get_formatted_messages(message_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns the formatted details of several messages keyed by ID, fetching the
+    ones missing from the cache with Gmail batch requests. Messages that could
+    not be retrieved are left out.
+    """
+    found: Dict[str, Dict[str, Any]] = {}
+    missing: List[str] = []
+    now = time.monotonic()
+    async with _message_cache_lock:
+        for message_id in dict.fromkeys(message_ids):
+            cached = _message_cache.get(message_id)
+            if cached and cached[0] > now:
+                _message_cache.move_to_end(message_id)
+                found[message_id] = {**cached[1], "labelIds": list(cached[1]["labelIds"])}
+            else:
+                missing.append(message_id)
+
+    if missing:
+        messages_raw = await _run_blocking(gmail_lib.get_raw_messages, gmail_service, missing)
+        # Formatting decodes every body, so keep it off the event loop as well
+        formatted_list = await _run_blocking(_format_message_details, list(messages_raw.values()))
+        async with _message_cache_lock:
+            for formatted in formatted_list:
+                _cache_formatted_message(formatted)
+        for formatted in formatted_list:
+            found[formatted["id"]] = {**formatted, "labelIds": list(formatted["labelIds"])}
+    return found
+
+def _format_message_details(messages_raw: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Formats several message resources for detailed view."""
+    return [_format_message_detail(message_raw) for message_raw in messages_raw]
+
+def _cache_formatted_message(formatted: Dict[str, Any]):
+    """Stores a formatted message, evicting the least recently used entry when full."""
+    message_id = formatted["id"]
+    _message_cache[message_id] = (time.monotonic() + MESSAGE_CACHE_TTL, formatted)
+    _message_cache.move_to_end(message_id)
+    if len(_message_cache) > MESSAGE_CACHE_SIZE:
+        _message_cache.popitem(last=False)
+
+def _update_cached_labels(message_id: str, label_ids: Optional[List[str]]):
+    """Records a message's new labels in the cache, or drops the entry when they are unknown."""
+    cached = _message_cache.get(message_id)
+    if cached is None:
+        return
+    if label_ids is None:
+        del _message_cache[message_id]
+    else:
+        cached[1]["labelIds"] = list(label_ids)
+
+async def _get_labels() -> List[Dict[str, Any]]:
+    """Returns the user's labels, from the cache when it is still fresh."""
+    global _labels_cache
+    async with _labels_cache_lock:
+        if _labels_cache is None or _labels_cache[0] <= time.monotonic():
+            labels = await gmail_client.get_labels()
+            _labels_cache = (time.monotonic() + LABELS_CACHE_TTL, labels)
+        return list(_labels_cache[1])
+
+def _check_label_known(label_id: str):
+    """Drops the cached labels when a message was given a label they don't include."""
+    global _labels_cache
+    if _labels_cache is not None and all(label['id'] != label_id for label in _labels_cache[1]):
+        _labels_cache = None
+
+def _prepare_message(message: Dict[str, Any], max_body_chars: Optional[int] = None,
+                     include_headers: bool = False) -> Dict[str, Any]:
+    """
+    Readies a formatted message for a response: the full header map is included
+    only when requested, and the body fields are capped at max_body_chars,
+    flagging whether anything was cut.
+    """
+    headers = message.pop("headers", None)
+    if include_headers and headers is not None:
+        message["headers"] = headers.as_dict() if isinstance(headers, _HeaderView) else headers
+    if max_body_chars is None:
+        return message
+    truncated = False
+    for key in ("body", "bodyHtml"):
+        value = message.get(key)
+        if value and len(value) > max_body_chars:
+            message[key] = value[:max_body_chars]
+            truncated = True
+    message["bodyTruncated"] = truncated
+    return message
+
 # --- Pydantic Models for Tool Parameters ---
 
-class ListMessagesRequest(BaseModel):
+class _RequestModel(BaseModel):
+    # Unknown fields sent by a client are dropped rather than tracked as extras
+    model_config = ConfigDict(extra='ignore', validate_assignment=False)
+
+class ListMessagesRequest(_RequestModel):
     query: str = Field(default='', description="Search query (e.g., 'from:user@example.com is:unread')")
     max_results: int = Field(default=10, description="Maximum number of messages to return")
     label_ids: Optional[List[str]] = Field(default=None, description="List of label IDs to filter by (e.g., ['INBOX', 'UNREAD'])")
 
-class SearchMessagesRequest(BaseModel):
+class SearchMessagesRequest(_RequestModel):
     query: str = Field(description="The search query (e.g., 'subject:important after:2023/01/01')")
     max_results: int = Field(default=10, description="Maximum number of messages to return")
 
-class GetMessageRequest(BaseModel):
+class GetMessageRequest(_RequestModel):
     message_id: str = Field(description="The ID of the message to retrieve")
 
-class SendMessageRequest(BaseModel):
+class SendMessageRequest(_RequestModel):
     to: str = Field(description="Recipient's email address")
     subject: str = Field(description="Subject of the email")
     body: str = Field(description="Body content of the email")
     cc: Optional[str] = Field(default=None, description="CC recipients (comma-separated if multiple)")
     bcc: Optional[str] = Field(default=None, description="BCC recipients (comma-separated if multiple)")
 
-class ReplyToMessageRequest(BaseModel):
+class ReplyToMessageRequest(_RequestModel):
     message_id: str = Field(description="The ID of the message to reply to")
     reply_body: str = Field(description="The content of the reply")
 
-class LabelMessageRequest(BaseModel):
+class LabelMessageRequest(_RequestModel):
     message_id: str = Field(description="The ID of the message")
     label_id: str = Field(description="The ID of the label")
 
-class MarkAsUnreadRequest(BaseModel):
+class MarkAsUnreadRequest(_RequestModel):
     message_id: str = Field(description="The ID of the message to mark as unread")
 
-class MarkAsReadRequest(BaseModel):
+class MarkAsReadRequest(_RequestModel):
     message_id: str = Field(description="The ID of the message to mark as read")
 
 # --- MCP Tools ---
@@ -229,7 +442,10 @@ async def list_messages(
     ctx: Context, 
     query: str = '', 
     max_results: int = 10, 
-    label_ids: Optional[List[str]] = None
+    label_ids: Optional[List[str]] = None,
+    include_body: bool = False,
+    max_body_chars: Optional[int] = None,
+    include_headers: bool = False
 ) -> Dict[str, Any]:
     """
     Lists Gmail messages.
@@ -238,27 +454,29 @@ async def list_messages(
         query: Search query (e.g., 'from:user@example.com is:unread').
         max_results: Maximum number of messages to return.
         label_ids: List of label IDs to filter by (e.g., ['INBOX', 'UNREAD']).
+        include_body: If True, each message is returned in full detail, as from get_message.
+        max_body_chars: With include_body, truncates each body to this many characters.
+        include_headers: With include_body, also returns every header of each message under 'headers'.
     """
     await ctx.info(f"Fetching messages with query: '{query}', max_results: {max_results}, labels: {label_ids}...")
     if not await _ensure_service(ctx):
         return {"error": "Gmail service not available."}
 
     try:
-        loop = asyncio.get_running_loop()
-        messages_raw = await loop.run_in_executor(
-            None, 
-            gmail_lib.list_messages, 
-            gmail_service, 
-            query, 
-            max_results, 
-            label_ids
-        )
+        messages_raw = await gmail_client.list_messages(query, max_results, label_ids)
         
         if messages_raw is None: # gmail_lib.list_messages returns [] on error, or None if service fails before call
              await ctx.error("Failed to retrieve messages. The library call returned None.")
              return {"error": "Failed to retrieve messages. Library error."}
 
-        formatted_messages = [_format_message_summary(msg) for msg in messages_raw]
+        # Summaries from gmail_lib already have the list-view shape, so they are returned as is
+        formatted_messages = _add_iso_dates(messages_raw)
+        if include_body:
+            details = await _get_formatted_messages([msg["id"] for msg in formatted_messages])
+            formatted_messages = [
+                _prepare_message(details[msg["id"]], max_body_chars, include_headers) if msg["id"] in details else msg
+                for msg in formatted_messages
+            ]
         await ctx.info(f"Found {len(formatted_messages)} messages.")
         return {"messages": formatted_messages}
     except Exception as e:
@@ -266,33 +484,65 @@ async def list_messages(
         return {"error": f"An unexpected error occurred: {str(e)}"}
 
 @mcp.tool()
-async def get_message(ctx: Context, message_id: str) -> Dict[str, Any]:
+async def get_message(ctx: Context, message_id: str, max_body_chars: Optional[int] = None,
+                      include_headers: bool = False) -> Dict[str, Any]:
     """
     Gets a specific Gmail message by its ID.
 
     Args:
         message_id: The ID of the message to retrieve.
+        max_body_chars: If set, body content is truncated to this many characters
+                        and 'bodyTruncated' reports whether anything was cut.
+        include_headers: If True, every header of the message is returned under 'headers'.
     """
     await ctx.info(f"Fetching message with ID: {message_id}...")
     if not await _ensure_service(ctx):
         return {"error": "Gmail service not available."}
 
     try:
-        loop = asyncio.get_running_loop()
-        # gmail_lib.get_message fetches 'full' format by default
-        message_raw = await loop.run_in_executor(None, gmail_lib.get_message, gmail_service, message_id)
+        formatted_message = await _get_formatted_message(message_id)
         
-        if not message_raw:
+        if not formatted_message:
             await ctx.error(f"Message with ID '{message_id}' not found or failed to retrieve.")
             return {"error": f"Message '{message_id}' not found or error in retrieval."}
         
-        formatted_message = _format_message_detail(message_raw)
+        formatted_message = _prepare_message(formatted_message, max_body_chars, include_headers)
         await ctx.info(f"Successfully retrieved message ID: {message_id}.")
         return {"message": formatted_message}
     except Exception as e:
         await ctx.error(f"Error getting message '{message_id}': {str(e)}")
         return {"error": f"An unexpected error occurred while fetching message '{message_id}': {str(e)}"}
 
+@mcp.tool()
+async def get_messages_bulk(ctx: Context, message_ids: List[str], max_body_chars: Optional[int] = None,
+                            include_headers: bool = False) -> Dict[str, Any]:
+    """
+    Gets several Gmail messages by ID, fetched together in batch requests.
+    Prefer this over repeated get_message calls.
+
+    Args:
+        message_ids: The IDs of the messages to retrieve.
+        max_body_chars: If set, each body is truncated to this many characters
+                        and 'bodyTruncated' reports whether anything was cut.
+        include_headers: If True, every header of each message is returned under 'headers'.
+    """
+    await ctx.info(f"Fetching {len(message_ids)} messages...")
+    if not await _ensure_service(ctx):
+        return {"error": "Gmail service not available."}
+
+    try:
+        details = await _get_formatted_messages(message_ids)
+        messages = [_prepare_message(details[message_id], max_body_chars, include_headers)
+                    for message_id in message_ids if message_id in details]
+        not_found = [message_id for message_id in message_ids if message_id not in details]
+        if not_found:
+            await ctx.error(f"Could not retrieve {len(not_found)} of {len(message_ids)} messages.")
+        await ctx.info(f"Successfully retrieved {len(messages)} messages.")
+        return {"messages": messages, "notFound": not_found}
+    except Exception as e:
+        await ctx.error(f"Error getting messages: {str(e)}")
+        return {"error": f"An unexpected error occurred while fetching messages: {str(e)}"}
+
 @mcp.tool()
 async def search_messages(ctx: Context, request: SearchMessagesRequest) -> Dict[str, Any]:
     """
@@ -307,20 +557,13 @@ async def search_messages(ctx: Context, request: SearchMessagesRequest) -> Dict[
         return {"error": "Gmail service not available."}
     
     try:
-        loop = asyncio.get_running_loop()
-        messages_raw = await loop.run_in_executor(
-            None,
-            gmail_lib.search_messages, # gmail_lib has a dedicated search_messages
-            gmail_service,
-            request.query,
-            request.max_results
-        )
+        messages_raw = await gmail_client.search_messages(request.query, request.max_results)
 
         if messages_raw is None:
              await ctx.error("Search messages call returned None.")
              return {"error": "Failed to search messages. Library error."}
 
-        formatted_messages = [_format_message_summary(msg) for msg in messages_raw]
+        formatted_messages = _add_iso_dates(messages_raw)
         await ctx.info(f"Search found {len(formatted_messages)} messages.")
         return {"messages": formatted_messages}
     except Exception as e:
@@ -351,17 +594,7 @@ async def send_message(
         return {"error": "Gmail service not available."}
 
     try:
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(
-            None, 
-            gmail_lib.send_message, 
-            gmail_service, 
-            to, 
-            subject, 
-            body, 
-            cc, 
-            bcc
-        )
+        result = await gmail_client.send_message(to, subject, body, cc, bcc)
         
         if result and 'id' in result:
             await ctx.info(f"Email sent successfully. Message ID: {result['id']}")
@@ -390,9 +623,7 @@ async def reply_to_message(ctx: Context, message_id: str, reply_body: str) -> Di
         return {"error": "Gmail service not available."}
 
     try:
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(
-            None, 
+        result = await _run_blocking(
             gmail_lib.reply_to_message, 
             gmail_service, 
             message_id, 
@@ -419,8 +650,8 @@ async def mark_message_as_read(ctx: Context, message_id: str) -> Dict[str, Any]:
         return {"error": "Gmail service not available."}
 
     try:
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(None, gmail_lib.mark_as_read, gmail_service, message_id)
+        result = await gmail_client.mark_as_read(message_id)
+        _update_cached_labels(message_id, result.get('labelIds') if result else None)
         if result and 'id' in result: # modify usually returns the message resource
             await ctx.info(f"Message '{message_id}' marked as read. Current labels: {result.get('labelIds')}")
             return {"success": True, "messageId": result['id'], "labelIds": result.get('labelIds')}
@@ -439,8 +670,8 @@ async def mark_message_as_unread(ctx: Context, message_id: str) -> Dict[str, Any
         return {"error": "Gmail service not available."}
 
     try:
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(None, gmail_lib.mark_as_unread, gmail_service, message_id)
+        result = await gmail_client.mark_as_unread(message_id)
+        _update_cached_labels(message_id, result.get('labelIds') if result else None)
         if result and 'id' in result:
             await ctx.info(f"Message '{message_id}' marked as unread. Current labels: {result.get('labelIds')}")
             return {"success": True, "messageId": result['id'], "labelIds": result.get('labelIds')}
@@ -462,8 +693,9 @@ async def add_label_to_message(ctx: Context, message_id: str, label_id: str) ->
         return {"error": "Gmail service not available."}
 
     try:
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(None, gmail_lib.add_label_to_message, gmail_service, message_id, label_id)
+        result = await gmail_client.add_label_to_message(message_id, label_id)
+        _update_cached_labels(message_id, result.get('labelIds') if result else None)
+        _check_label_known(label_id)
         if result and 'id' in result:
             await ctx.info(f"Label '{label_id}' added to message '{message_id}'. Current labels: {result.get('labelIds')}")
             return {"success": True, "messageId": result['id'], "labelIds": result.get('labelIds')}
@@ -482,8 +714,9 @@ async def remove_label_from_message(ctx: Context, message_id: str, label_id: str
         return {"error": "Gmail service not available."}
 
     try:
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(None, gmail_lib.remove_label_from_message, gmail_service, message_id, label_id)
+        result = await gmail_client.remove_label_from_message(message_id, label_id)
+        _update_cached_labels(message_id, result.get('labelIds') if result else None)
+        _check_label_known(label_id)
         if result and 'id' in result:
             await ctx.info(f"Label '{label_id}' removed from message '{message_id}'. Current labels: {result.get('labelIds')}")
             return {"success": True, "messageId": result['id'], "labelIds": result.get('labelIds')}
@@ -494,6 +727,56 @@ async def remove_label_from_message(ctx: Context, message_id: str, label_id: str
         await ctx.error(f"Error removing label '{label_id}' from message '{message_id}': {str(e)}")
         return {"success": False, "error": f"An unexpected error occurred: {str(e)}"}
 
+async def _modify_messages(ctx: Context, action: str, modify_fn, message_ids: List[str], *args) -> Dict[str, Any]:
+    """
+    Runs a gmail_lib bulk modify function (messages.batchModify) over several
+    messages, so a batch of label changes costs a single MCP and API round-trip.
+    batchModify returns no message resources, so results carry no labelIds.
+    """
+    await ctx.info(f"{action} for {len(message_ids)} messages...")
+    if not await _ensure_service(ctx):
+        return {"error": "Gmail service not available."}
+
+    try:
+        modified = set(await _run_blocking(modify_fn, gmail_service, message_ids, *args))
+        # batchModify does not report the resulting labels, so drop the cached details
+        for message_id in message_ids:
+            _update_cached_labels(message_id, None)
+        results = {
+            message_id: {"success": True, "messageId": message_id} if message_id in modified
+            else {"success": False, "error": f"Failed to modify message '{message_id}'."}
+            for message_id in message_ids
+        }
+        failed = sum(1 for result in results.values() if not result["success"])
+        if failed:
+            await ctx.error(f"{action} failed for {failed} of {len(message_ids)} messages.")
+        return {"results": results}
+    except Exception as e:
+        await ctx.error(f"Error during bulk operation ({action}): {str(e)}")
+        return {"error": f"An unexpected error occurred: {str(e)}"}
+
+@mcp.tool()
+async def mark_messages_as_read(ctx: Context, message_ids: List[str]) -> Dict[str, Any]:
+    """Marks several messages as read. Returns per-message results keyed by message ID."""
+    return await _modify_messages(ctx, "Marking as read", gmail_lib.mark_as_read_bulk, message_ids)
+
+@mcp.tool()
+async def mark_messages_as_unread(ctx: Context, message_ids: List[str]) -> Dict[str, Any]:
+    """Marks several messages as unread. Returns per-message results keyed by message ID."""
+    return await _modify_messages(ctx, "Marking as unread", gmail_lib.mark_as_unread_bulk, message_ids)
+
+@mcp.tool()
+async def add_label_to_messages(ctx: Context, message_ids: List[str], label_id: str) -> Dict[str, Any]:
+    """Adds a label to several messages. Returns per-message results keyed by message ID."""
+    results = await _modify_messages(ctx, f"Adding label '{label_id}'", gmail_lib.add_label_to_messages, message_ids, label_id)
+    _check_label_known(label_id)
+    return results
+
+@mcp.tool()
+async def remove_label_from_messages(ctx: Context, message_ids: List[str], label_id: str) -> Dict[str, Any]:
+    """Removes a label from several messages. Returns per-message results keyed by message ID."""
+    return await _modify_messages(ctx, f"Removing label '{label_id}'", gmail_lib.remove_label_from_messages, message_ids, label_id)
+
 @mcp.tool()
 async def list_labels(ctx: Context) -> Dict[str, Any]:
     """Lists all Gmail labels for the authenticated user."""
@@ -502,8 +785,7 @@ async def list_labels(ctx: Context) -> Dict[str, Any]:
         return {"error": "Gmail service not available."}
 
     try:
-        loop = asyncio.get_running_loop()
-        labels = await loop.run_in_executor(None, gmail_lib.get_labels, gmail_service)
+        labels = await _get_labels()
         
         if labels is None: # gmail_lib.get_labels returns [] on error, or None if service fails
             await ctx.error("Failed to retrieve labels. The library call returned None.")
@@ -524,15 +806,13 @@ async def get_messages_resource(ctx: Context) -> Dict[str, Any]:
         return {"error": "Gmail service not available."}
 
     try:
-        loop = asyncio.get_running_loop()
-        messages = await loop.run_in_executor(None, gmail_lib.list_messages, gmail_service)
+        messages = await gmail_client.list_messages()
         
         if messages is None:
             await ctx.error("Failed to retrieve messages. The library call returned None.")
             return {"error": "Failed to retrieve messages. Library error."}
 
-        formatted_messages = [_format_message_summary(msg) for msg in messages]
-        return {"messages": formatted_messages}
+        return {"messages": _add_iso_dates(messages)}
     except Exception as e:
         await ctx.error(f"Error getting messages: {str(e)}")
         return {"error": f"An unexpected error occurred: {str(e)}"}
@@ -544,15 +824,13 @@ async def get_message_resource(ctx: Context, message_id: str) -> Dict[str, Any]:
         return {"error": "Gmail service not available."}
 
     try:
-        loop = asyncio.get_running_loop()
-        message = await loop.run_in_executor(None, gmail_lib.get_message, gmail_service, message_id)
+        formatted_message = await _get_formatted_message(message_id)
         
-        if not message:
+        if not formatted_message:
             await ctx.error(f"Message with ID '{message_id}' not found or failed to retrieve.")
             return {"error": f"Message '{message_id}' not found or error in retrieval."}
         
-        formatted_message = _format_message_detail(message)
-        return {"message": formatted_message}
+        return {"message": _prepare_message(formatted_message, include_headers=True)}
     except Exception as e:
         await ctx.error(f"Error getting message: {str(e)}")
         return {"error": f"An unexpected error occurred: {str(e)}"}
@@ -564,8 +842,7 @@ async def get_labels_resource(ctx: Context) -> Dict[str, Any]:
         return {"error": "Gmail service not available."}
 
     try:
-        loop = asyncio.get_running_loop()
-        labels = await loop.run_in_executor(None, gmail_lib.get_labels, gmail_service)
+        labels = await _get_labels()
         
         if labels is None:
             await ctx.error("Failed to retrieve labels. The library call returned None.")
@@ -578,6 +855,14 @@ async def get_labels_resource(ctx: Context) -> Dict[str, Any]:
 
 # --- Server Setup and Main Execution ---
 
+async def serve(**transport_kwargs):
+    """Runs the server, closing the async Gmail client's connection pool when it stops."""
+    try:
+        await mcp.run_async(**transport_kwargs)
+    finally:
+        if gmail_client is not None:
+            await gmail_client.aclose()
+
 def setup_server_initialization_message():
     """Optional: Print initial server setup messages."""
     print(f"⚙️  Initializing {SERVER_NAME} v{SERVER_VERSION}...")
@@ -599,10 +884,18 @@ if __name__ == "__main__":
     host = os.getenv("MCP_HOST", MCP_HOST)
     port = int(os.getenv("MCP_PORT", MCP_PORT))
     
+    try:
+        import uvloop
+    except ImportError:  # uvloop is not available on Windows
+        pass
+    else:
+        # Set before asyncio.run() below so the server loop is a uvloop one
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
     try:
         # Run with HTTP transport by default
         print(f"🌐 Starting server on {host}:{port}")
-        mcp.run(transport="streamable-http", host=host, port=port)
+        asyncio.run(serve(transport="streamable-http", host=host, port=port))
     except Exception as e:
         print(f"❌ Critical server error: {e}")
         import traceback
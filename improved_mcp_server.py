@@ -8,22 +8,163 @@ using the   MCP v2 framework. It properly implements MCP tools for interacting
 with Microsoft To Do APIs through the msgraph_todo_lib module.
 """
 
+import asyncio
+import functools
+import inspect
+import time
+import orjson
+from collections import OrderedDict
 from fastmcp import FastMCP, Context
-from typing import List, Optional, Dict, Any
+from pydantic import Field
+from typing import Annotated, List, Literal, Optional, Dict, Any
+from typing_extensions import NotRequired, TypedDict
 import msgraph_todo_lib as todo_lib
-import httpx
+
+# Keeps the stdlib's behaviour for non-string dict keys (stringified), which
+# orjson otherwise refuses
+_SERIALIZE_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+def _serialize_result(data: Any) -> str:
+    """Serializes tool results to JSON text with orjson. Tools return plain
+    dicts and lists, so anything else (e.g. a raw TodoTask) is a bug and fails."""
+    return orjson.dumps(data, option=_SERIALIZE_OPTIONS).decode("utf-8")
 
 # Create the FastMCP server instance with proper metadata
 mcp = FastMCP(
     name="Microsoft To Do",
     description="MCP server for interacting with Microsoft To Do API",
-    version="1.0.0"
+    version="1.0.0",
+    tool_serializer=_serialize_result
 )
 
+# Token from todo_lib with its expiry on the monotonic clock, so tool calls can
+# skip the thread hop into ensure_access_token() while it is still valid
+_token_cache = (None, 0.0)
+
+# Task lists change rarely; list_task_lists and the todo://lists resource reuse
+# the last listing for a minute. Creating or deleting a list drops it
+LISTS_CACHE_TTL = 60
+_lists_cache = None
+_lists_cache_lock = asyncio.Lock()
+
+# Formatted tasks by Graph eTag, least recently used first. An eTag changes with
+# every edit, so an entry never goes stale; the agent rescanning a list just
+# reuses the dicts from the previous scan
+FORMAT_CACHE_SIZE = 10_000
+_format_cache = OrderedDict()
+
+async def _get_access_token():
+    """Gets a Graph access token; renewing may run the interactive login, so it runs in a thread."""
+    global _token_cache
+    token, expires = _token_cache
+    if token and time.monotonic() < expires - 60:
+        return token
+    token = await asyncio.to_thread(todo_lib.ensure_access_token)
+    if token:
+        _token_cache = (token, time.monotonic() + todo_lib.token_expires_at - time.time())
+    return token
+
+async def _get_task_lists(access_token):
+    """Gets the user's task lists, from the cache when it is still fresh."""
+    global _lists_cache
+    async with _lists_cache_lock:
+        if _lists_cache is None or _lists_cache[0] <= time.monotonic():
+            task_lists = await todo_lib.get_todo_lists(access_token)
+            if not task_lists:
+                # Errors come back as an empty list; don't hold on to them
+                return task_lists
+            _lists_cache = (time.monotonic() + LISTS_CACHE_TTL, task_lists)
+        return _lists_cache[1]
+
+def require_token(fn):
+    """
+    Decorates a tool or resource that takes a Graph access token right after ctx.
+    The token is looked up and passed in per call; when authentication fails the
+    call returns an error without running. The parameter is hidden from the
+    signature FastMCP builds the schema from.
+    """
+    @functools.wraps(fn)
+    async def wrapper(ctx: Context, *args, **kwargs):
+        access_token = await _get_access_token()
+        if not access_token:
+            await ctx.error("Failed to authenticate with Microsoft Graph API")
+            return {"error": "Authentication failed"}
+        return await fn(ctx, access_token, *args, **kwargs)
+    
+    signature = inspect.signature(fn)
+    ctx_param, _, *params = signature.parameters.values()
+    wrapper.__signature__ = signature.replace(parameters=[ctx_param, *params])
+    return wrapper
+
+def _invalidate_task_lists():
+    """Drops the cached task lists after a list is created or deleted."""
+    global _lists_cache
+    _lists_cache = None
+
+# ---- Argument Types ----
+
+# Declared on the tool signatures so schema validation rejects bad values
+# before any Graph request is made
+TaskStatus = Literal["notStarted", "inProgress", "completed", "waitingOnOthers", "deferred"]
+# YYYY-MM-DD, or an empty string where the tool allows clearing the date
+DueDate = Annotated[str, Field(pattern=r"^(\d{4}-\d{2}-\d{2})?$")]
+
+class NewTask(TypedDict):
+    """One task for bulk_create_tasks, checked like create_task's arguments"""
+    title: str
+    description: NotRequired[str]
+    due_date: NotRequired[DueDate]
+
+# ---- Formatting ----
+
+def _format_task_list(task_list: Dict[str, Any]) -> Dict[str, Any]:
+    """Formats a Graph todoTaskList for tool responses."""
+    return {
+        "id": task_list["id"],
+        "name": task_list["displayName"],
+        "isShared": task_list.get("isShared", False),
+        "isOwner": task_list.get("isOwner", False),
+        "wellKnownListName": task_list.get("wellknownListName") or ""
+    }
+
+def _format_task(task: todo_lib.TodoTask) -> Dict[str, Any]:
+    """
+    Formats a decoded task for tool responses, leaving out empty optional fields.
+    Every tool returning tasks goes through here, so the date handling lives in one place.
+    The result is cached on the task's eTag and must not be modified by callers.
+    """
+    etag = task.etag
+    if etag:
+        task_data = _format_cache.get(etag)
+        if task_data is not None:
+            _format_cache.move_to_end(etag)
+            return task_data
+    task_data = {"id": task.id, "title": task.title, "status": task.status}
+    due = task.dueDateTime
+    if due is not None:
+        task_data["dueDate"] = due.dateTime[:10]  # Extract YYYY-MM-DD
+    body = task.body
+    if body is not None and body.content:
+        task_data["description"] = body.content
+    if etag:
+        _format_cache[etag] = task_data
+        if len(_format_cache) > FORMAT_CACHE_SIZE:
+            _format_cache.popitem(last=False)
+    return task_data
+
+def _format_task_lists(task_lists: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Formats task lists; shared by list_task_lists and the todo://lists resource."""
+    return [_format_task_list(task_list) for task_list in task_lists]
+
+def _format_tasks(tasks: List[todo_lib.TodoTask]) -> List[Dict[str, Any]]:
+    """Formats tasks; shared by list_tasks and the todo://lists/{list_id}/tasks resource."""
+    return [_format_task(task) for task in tasks]
+
 # ---- Task Lists Tools ----
 
 @mcp.tool()
-async def list_task_lists(ctx: Context) -> Dict[str, Any]:
+@require_token
+async def list_task_lists(ctx: Context, access_token: str) -> Dict[str, Any]:
     """
     Lists all Microsoft To Do task lists
     
@@ -32,31 +173,18 @@ async def list_task_lists(ctx: Context) -> Dict[str, Any]:
     """
     await ctx.info("Fetching your Microsoft To Do task lists...")
     
-    # Ensure we have a valid access token
-    access_token = todo_lib.ensure_access_token()
-    if not access_token:
-        await ctx.error("Failed to authenticate with Microsoft Graph API")
-        return {"error": "Authentication failed"}
-    
     # Get task lists
-    task_lists = todo_lib.get_todo_lists(access_token)
+    task_lists = await _get_task_lists(access_token)
     
     # Format the response
-    formatted_lists = []
-    for task_list in task_lists:
-        formatted_lists.append({
-            "id": task_list["id"],
-            "name": task_list["displayName"],
-            "isShared": task_list["isShared"],
-            "isOwner": task_list["isOwner"],
-            "wellKnownListName": task_list["wellknownListName"] if "wellknownListName" in task_list else ""
-        })
+    formatted_lists = _format_task_lists(task_lists)
     
     await ctx.info(f"Found {len(formatted_lists)} task lists")
     return {"taskLists": formatted_lists}
 
 @mcp.tool()
-async def create_task_list(ctx: Context, name: str) -> Dict[str, Any]:
+@require_token
+async def create_task_list(ctx: Context, access_token: str, name: str) -> Dict[str, Any]:
     """
     Creates a new task list in Microsoft To Do
     
@@ -68,18 +196,13 @@ async def create_task_list(ctx: Context, name: str) -> Dict[str, Any]:
     """
     await ctx.info(f"Creating new task list: '{name}'...")
     
-    # Ensure we have a valid access token
-    access_token = todo_lib.ensure_access_token()
-    if not access_token:
-        await ctx.error("Failed to authenticate with Microsoft Graph API")
-        return {"error": "Authentication failed"}
-    
     # Create new task list
-    new_list = todo_lib.create_todo_list(access_token, name)
+    new_list = await todo_lib.create_todo_list(access_token, name)
     
     if not new_list:
         await ctx.error("Failed to create task list")
         return {"error": "Failed to create task list"}
+    _invalidate_task_lists()
     
     await ctx.info(f"Successfully created task list: '{name}'")
     return {
@@ -93,7 +216,8 @@ async def create_task_list(ctx: Context, name: str) -> Dict[str, Any]:
 # ---- Tasks Tools ----
 
 @mcp.tool()
-async def list_tasks(ctx: Context, list_id: str) -> Dict[str, Any]:
+@require_token
+async def list_tasks(ctx: Context, access_token: str, list_id: str) -> Dict[str, Any]:
     """
     Lists all tasks in a task list
     
@@ -105,43 +229,27 @@ async def list_tasks(ctx: Context, list_id: str) -> Dict[str, Any]:
     """
     await ctx.info(f"Fetching tasks for list ID: {list_id}...")
     
-    # Ensure we have a valid access token
-    access_token = todo_lib.ensure_access_token()
-    if not access_token:
-        await ctx.error("Failed to authenticate with Microsoft Graph API")
-        return {"error": "Authentication failed"}
-    
-    # Get tasks from the list
-    tasks = todo_lib.get_tasks(access_token, list_id)
-    
-    # Format the response
+    # Get tasks from the list, formatting each page as it arrives while the
+    # later ones are still downloading
     formatted_tasks = []
-    for task in tasks:
-        task_data = {
-            "id": task["id"],
-            "title": task["title"],
-            "status": task["status"]
-        }
-        
-        # Add optional fields if they exist
-        if "dueDateTime" in task:
-            task_data["dueDate"] = task["dueDateTime"]["dateTime"][:10]  # Extract YYYY-MM-DD
-        
-        if "body" in task and task["body"]["content"]:
-            task_data["description"] = task["body"]["content"]
-            
-        formatted_tasks.append(task_data)
+    try:
+        async for page in todo_lib.iter_task_pages(access_token, list_id):
+            formatted_tasks.extend(_format_tasks(page))
+    except Exception as e:
+        await ctx.error(f"Failed to fetch tasks: {str(e)}")
+        return {"error": f"Failed to fetch tasks: {str(e)}"}
     
     await ctx.info(f"Found {len(formatted_tasks)} tasks")
     return {"tasks": formatted_tasks}
 
 @mcp.tool()
+@require_token
 async def create_task(
-    ctx: Context, 
+    ctx: Context, access_token: str, 
     list_id: str, 
     title: str, 
     description: str = "", 
-    due_date: str = ""
+    due_date: DueDate = ""
 ) -> Dict[str, Any]:
     """
     Creates a new task in a task list
@@ -157,32 +265,15 @@ async def create_task(
     """
     await ctx.info(f"Creating new task '{title}' in list {list_id}...")
     
-    # Ensure we have a valid access token
-    access_token = todo_lib.ensure_access_token()
-    if not access_token:
-        await ctx.error("Failed to authenticate with Microsoft Graph API")
-        return {"error": "Authentication failed"}
-    
     # Create the task
-    new_task = todo_lib.create_task(access_token, list_id, title, description, due_date)
+    new_task = await todo_lib.create_task(access_token, list_id, title, description, due_date)
     
     if not new_task:
         await ctx.error("Failed to create task")
         return {"error": "Failed to create task"}
     
     # Format the response
-    task_data = {
-        "id": new_task["id"],
-        "title": new_task["title"],
-        "status": new_task["status"]
-    }
-    
-    # Add optional fields if they exist
-    if "dueDateTime" in new_task:
-        task_data["dueDate"] = new_task["dueDateTime"]["dateTime"][:10]
-    
-    if "body" in new_task and new_task["body"]["content"]:
-        task_data["description"] = new_task["body"]["content"]
+    task_data = _format_task(new_task)
     
     await ctx.info(f"Successfully created task: '{title}'")
     return {
@@ -191,7 +282,79 @@ async def create_task(
     }
 
 @mcp.tool()
-async def complete_task(ctx: Context, list_id: str, task_id: str) -> Dict[str, Any]:
+@require_token
+async def list_tasks_in_lists(ctx: Context, access_token: str, list_ids: List[str]) -> Dict[str, Any]:
+    """
+    Lists the tasks of several task lists at once, in batched requests
+    
+    Args:
+        list_ids: The IDs of the task lists
+    
+    Returns:
+        The tasks of each list by list ID, and the IDs of any lists that could not be read
+    """
+    await ctx.info(f"Fetching tasks for {len(list_ids)} lists...")
+    
+    # Get the tasks of every list
+    results = await todo_lib.get_tasks_for_lists(access_token, list_ids)
+    
+    # Format the response
+    tasks_by_list = {}
+    failed = []
+    for list_id, tasks in zip(list_ids, results):
+        if tasks is None:
+            failed.append(list_id)
+            continue
+        tasks_by_list[list_id] = _format_tasks(tasks)
+    
+    if failed:
+        await ctx.error(f"Failed to fetch tasks for {len(failed)} of {len(list_ids)} lists")
+    await ctx.info(f"Found {sum(len(tasks) for tasks in tasks_by_list.values())} tasks")
+    return {
+        "tasks": tasks_by_list,
+        "failed": failed
+    }
+
+@mcp.tool()
+@require_token
+async def bulk_create_tasks(ctx: Context, access_token: str, list_id: str, tasks: List[NewTask]) -> Dict[str, Any]:
+    """
+    Creates several tasks in a task list at once, in batched requests
+    
+    Args:
+        list_id: The ID of the task list
+        tasks: The tasks to create, each with a "title" and optional
+               "description" and "due_date" (YYYY-MM-DD)
+    
+    Returns:
+        The created tasks, and the titles of any that could not be created
+    """
+    await ctx.info(f"Creating {len(tasks)} tasks in list {list_id}...")
+    
+    # Create the tasks
+    results = await todo_lib.bulk_create_tasks(access_token, list_id, tasks)
+    
+    # Format the response
+    created_tasks = []
+    failed = []
+    for task, new_task in zip(tasks, results):
+        if not new_task:
+            failed.append(task["title"])
+            continue
+        created_tasks.append(_format_task(new_task))
+    
+    if failed:
+        await ctx.error(f"Failed to create {len(failed)} of {len(tasks)} tasks")
+    await ctx.info(f"Successfully created {len(created_tasks)} tasks")
+    return {
+        "success": not failed,
+        "tasks": created_tasks,
+        "failed": failed
+    }
+
+@mcp.tool()
+@require_token
+async def complete_task(ctx: Context, access_token: str, list_id: str, task_id: str) -> Dict[str, Any]:
     """
     Marks a task as completed
     
@@ -204,14 +367,8 @@ async def complete_task(ctx: Context, list_id: str, task_id: str) -> Dict[str, A
     """
     await ctx.info(f"Marking task {task_id} as completed...")
     
-    # Ensure we have a valid access token
-    access_token = todo_lib.ensure_access_token()
-    if not access_token:
-        await ctx.error("Failed to authenticate with Microsoft Graph API")
-        return {"error": "Authentication failed"}
-    
     # Complete the task
-    updated_task = todo_lib.complete_task(access_token, list_id, task_id)
+    updated_task = await todo_lib.complete_task(access_token, list_id, task_id)
     
     if not updated_task:
         await ctx.error("Failed to complete task")
@@ -221,14 +378,15 @@ async def complete_task(ctx: Context, list_id: str, task_id: str) -> Dict[str, A
     return {
         "success": True,
         "task": {
-            "id": updated_task["id"],
-            "title": updated_task["title"],
-            "status": updated_task["status"]
+            "id": updated_task.id,
+            "title": updated_task.title,
+            "status": updated_task.status
         }
     }
 
 @mcp.tool()
-async def delete_task(ctx: Context, list_id: str, task_id: str) -> Dict[str, Any]:
+@require_token
+async def delete_task(ctx: Context, access_token: str, list_id: str, task_id: str) -> Dict[str, Any]:
     """
     Deletes a task from a task list
     
@@ -241,14 +399,8 @@ async def delete_task(ctx: Context, list_id: str, task_id: str) -> Dict[str, Any
     """
     await ctx.info(f"Deleting task {task_id} from list {list_id}...")
     
-    # Ensure we have a valid access token
-    access_token = todo_lib.ensure_access_token()
-    if not access_token:
-        await ctx.error("Failed to authenticate with Microsoft Graph API")
-        return {"error": "Authentication failed"}
-    
     # Delete the task
-    success = todo_lib.delete_task(access_token, list_id, task_id)
+    success = await todo_lib.delete_task(access_token, list_id, task_id)
     
     if not success:
         await ctx.error("Failed to delete task")
@@ -258,14 +410,15 @@ async def delete_task(ctx: Context, list_id: str, task_id: str) -> Dict[str, Any
     return {"success": True}
 
 @mcp.tool()
+@require_token
 async def update_task(
-    ctx: Context, 
+    ctx: Context, access_token: str, 
     list_id: str, 
     task_id: str, 
-    title: str = None, 
-    description: str = None, 
-    due_date: str = None,
-    status: str = None
+    title: Optional[str] = None, 
+    description: Optional[str] = None, 
+    due_date: Optional[DueDate] = None,
+    status: Optional[TaskStatus] = None
 ) -> Dict[str, Any]:
     """
     Updates an existing task in a task list
@@ -283,14 +436,8 @@ async def update_task(
     """
     await ctx.info(f"Updating task {task_id} in list {list_id}...")
     
-    # Ensure we have a valid access token
-    access_token = todo_lib.ensure_access_token()
-    if not access_token:
-        await ctx.error("Failed to authenticate with Microsoft Graph API")
-        return {"error": "Authentication failed"}
-    
     # Update the task
-    updated_task = todo_lib.update_task(
+    updated_task = await todo_lib.update_task(
         access_token, 
         list_id, 
         task_id, 
@@ -305,18 +452,7 @@ async def update_task(
         return {"error": "Failed to update task"}
     
     # Format the response
-    task_data = {
-        "id": updated_task["id"],
-        "title": updated_task["title"],
-        "status": updated_task["status"]
-    }
-    
-    # Add optional fields if they exist
-    if "dueDateTime" in updated_task:
-        task_data["dueDate"] = updated_task["dueDateTime"]["dateTime"][:10]
-    
-    if "body" in updated_task and updated_task["body"]["content"]:
-        task_data["description"] = updated_task["body"]["content"]
+    task_data = _format_task(updated_task)
     
     await ctx.info(f"Successfully updated task")
     return {
@@ -325,7 +461,8 @@ async def update_task(
     }
 
 @mcp.tool()
-async def uncomplete_task(ctx: Context, list_id: str, task_id: str) -> Dict[str, Any]:
+@require_token
+async def uncomplete_task(ctx: Context, access_token: str, list_id: str, task_id: str) -> Dict[str, Any]:
     """
     Marks a task as not started (uncompletes a completed task)
     
@@ -338,14 +475,8 @@ async def uncomplete_task(ctx: Context, list_id: str, task_id: str) -> Dict[str,
     """
     await ctx.info(f"Marking task {task_id} as not started...")
     
-    # Ensure we have a valid access token
-    access_token = todo_lib.ensure_access_token()
-    if not access_token:
-        await ctx.error("Failed to authenticate with Microsoft Graph API")
-        return {"error": "Authentication failed"}
-    
     # Uncomplete the task
-    updated_task = todo_lib.uncomplete_task(access_token, list_id, task_id)
+    updated_task = await todo_lib.uncomplete_task(access_token, list_id, task_id)
     
     if not updated_task:
         await ctx.error("Failed to mark task as not started")
@@ -355,14 +486,15 @@ async def uncomplete_task(ctx: Context, list_id: str, task_id: str) -> Dict[str,
     return {
         "success": True,
         "task": {
-            "id": updated_task["id"],
-            "title": updated_task["title"],
-            "status": updated_task["status"]
+            "id": updated_task.id,
+            "title": updated_task.title,
+            "status": updated_task.status
         }
     }
 
 @mcp.tool()
-async def delete_task_list(ctx: Context, list_id: str) -> Dict[str, Any]:
+@require_token
+async def delete_task_list(ctx: Context, access_token: str, list_id: str) -> Dict[str, Any]:
     """
     Deletes a task list
     
@@ -374,18 +506,13 @@ async def delete_task_list(ctx: Context, list_id: str) -> Dict[str, Any]:
     """
     await ctx.info(f"Deleting task list {list_id}...")
     
-    # Ensure we have a valid access token
-    access_token = todo_lib.ensure_access_token()
-    if not access_token:
-        await ctx.error("Failed to authenticate with Microsoft Graph API")
-        return {"error": "Authentication failed"}
-    
     # Delete the task list
-    success = todo_lib.delete_task_list(access_token, list_id)
+    success = await todo_lib.delete_task_list(access_token, list_id)
     
     if not success:
         await ctx.error("Failed to delete task list")
         return {"error": "Failed to delete task list"}
+    _invalidate_task_lists()
     
     await ctx.info("Task list deleted successfully")
     return {"success": True}
@@ -393,70 +520,34 @@ async def delete_task_list(ctx: Context, list_id: str) -> Dict[str, Any]:
 # ---- Resources ----
 
 @mcp.resource("todo://lists")
-async def get_todo_lists(ctx: Context) -> Dict[str, Any]:
+@require_token
+async def get_todo_lists(ctx: Context, access_token: str) -> Dict[str, Any]:
     """
     Resource to get all Microsoft To Do task lists
     """
-    # Ensure we have a valid access token
-    access_token = todo_lib.ensure_access_token()
-    if not access_token:
-        await ctx.error("Failed to authenticate with Microsoft Graph API")
-        return {"error": "Authentication failed"}
-    
     # Get task lists
-    task_lists = todo_lib.get_todo_lists(access_token)
-    
-    # Format the response
-    formatted_lists = []
-    for task_list in task_lists:
-        formatted_lists.append({
-            "id": task_list["id"],
-            "name": task_list["displayName"],
-            "isShared": task_list["isShared"],
-            "isOwner": task_list["isOwner"]
-        })
+    task_lists = await _get_task_lists(access_token)
     
-    return {"taskLists": formatted_lists}
+    return {"taskLists": _format_task_lists(task_lists)}
 
 @mcp.resource("todo://lists/{list_id}/tasks")
-async def get_tasks_resource(ctx: Context, list_id: str) -> Dict[str, Any]:
+@require_token
+async def get_tasks_resource(ctx: Context, access_token: str, list_id: str) -> Dict[str, Any]:
     """
     Resource to get all tasks in a specific task list
     
     Args:
         list_id: The ID of the task list
     """
-    # Ensure we have a valid access token
-    access_token = todo_lib.ensure_access_token()
-    if not access_token:
-        await ctx.error("Failed to authenticate with Microsoft Graph API")
-        return {"error": "Authentication failed"}
-    
     # Get tasks from the list
-    tasks = todo_lib.get_tasks(access_token, list_id)
-    
-    # Format the response
-    formatted_tasks = []
-    for task in tasks:
-        task_data = {
-            "id": task["id"],
-            "title": task["title"],
-            "status": task["status"]
-        }
-        
-        # Add optional fields if they exist
-        if "dueDateTime" in task:
-            task_data["dueDate"] = task["dueDateTime"]["dateTime"][:10]
-        
-        if "body" in task and task["body"]["content"]:
-            task_data["description"] = task["body"]["content"]
-            
-        formatted_tasks.append(task_data)
+    tasks = await todo_lib.get_tasks(access_token, list_id)
     
-    return {"tasks": formatted_tasks}
+    # Format the response; unchanged tasks come straight from the eTag cache
+    return {"tasks": _format_tasks(tasks)}
 
 @mcp.resource("todo://lists/{list_id}/tasks/{task_id}")
-async def get_task_resource(ctx: Context, list_id: str, task_id: str) -> Dict[str, Any]:
+@require_token
+async def get_task_resource(ctx: Context, access_token: str, list_id: str, task_id: str) -> Dict[str, Any]:
     """
     Resource to get a specific task in a task list
     
@@ -464,47 +555,35 @@ async def get_task_resource(ctx: Context, list_id: str, task_id: str) -> Dict[st
         list_id: The ID of the task list
         task_id: The ID of the task
     """
-    # Ensure we have a valid access token
-    access_token = todo_lib.ensure_access_token()
-    if not access_token:
-        await ctx.error("Failed to authenticate with Microsoft Graph API")
-        return {"error": "Authentication failed"}
-    
-    # Get tasks from the list
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-    url = f"https://graph.microsoft.com/v1.0/me/todo/lists/{list_id}/tasks/{task_id}"
-    
+    # Get the task, or confirm the stored copy is still current
     try:
-        response = httpx.get(url, headers=headers)
-        
-        if response.status_code == 200:
-            task = response.json()
-            task_data = {
-                "id": task["id"],
-                "title": task["title"],
-                "status": task["status"]
-            }
-            
-            # Add optional fields if they exist
-            if "dueDateTime" in task:
-                task_data["dueDate"] = task["dueDateTime"]["dateTime"][:10]
-            
-            if "body" in task and task["body"]["content"]:
-                task_data["description"] = task["body"]["content"]
-                
-            return {"task": task_data}
-        else:
-            await ctx.error(f"Failed to get task: {response.status_code}")
-            return {"error": f"Failed to get task: {response.status_code}"}
+        content = await todo_lib.cached_get(f"/me/todo/lists/{list_id}/tasks/{task_id}", access_token)
+    except todo_lib.GraphRequestError as e:
+        await ctx.error(f"Failed to get task: {e.status_code}")
+        return {"error": f"Failed to get task: {e.status_code}"}
     except Exception as e:
         await ctx.error(f"Exception while getting task: {str(e)}")
         return {"error": f"Exception: {str(e)}"}
+    
+    # An unchanged task keeps its eTag, so this is a format-cache hit
+    return {"task": _format_task(todo_lib.decode_task(content))}
 
 # ---- Prompts ----
 
+_CREATE_TASK_PROMPT = """
+    Let's create a new task in your '{list_name}' list.
+    
+    Please provide:
+    1. Task title (required)
+    2. Task description (optional)
+    3. Due date (optional, in YYYY-MM-DD format)
+    """
+
+@functools.lru_cache(maxsize=128)
+def _create_task_prompt_text(list_name: str) -> str:
+    """Fills in the create-task prompt; clients tend to ask for the same few lists."""
+    return _CREATE_TASK_PROMPT.format(list_name=list_name)
+
 @mcp.prompt()
 async def create_task_prompt(list_name: str) -> str:
     """
@@ -513,22 +592,30 @@ async def create_task_prompt(list_name: str) -> str:
     Args:
         list_name: The name of the task list
     """
-    return f"""
-    Let's create a new task in your '{list_name}' list.
-    
-    Please provide:
-    1. Task title (required)
-    2. Task description (optional)
-    3. Due date (optional, in YYYY-MM-DD format)
-    """
+    return _create_task_prompt_text(list_name)
+
+async def serve(**transport_kwargs):
+    """Runs the server, closing the shared Graph connection pool when it stops."""
+    try:
+        await mcp.run_async(**transport_kwargs)
+    finally:
+        await todo_lib.aclose()
 
 # Run the server if executed directly
 if __name__ == "__main__":
+    try:
+        import uvloop
+    except ImportError:  # uvloop is not available on Windows
+        pass
+    else:
+        # Set before asyncio.run() below so the server loop is a uvloop one
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
     # Configure the server to use the appropriate transport
     # Default is stdio, which works well for local command-line tools
-    #mcp.run()
+    #asyncio.run(serve())
     
     # For HTTP transport, us the run_http_server.py script
-    mcp.run(transport="streamable-http", host="127.0.0.1", port=8080, path="/mcp")
+    asyncio.run(serve(transport="streamable-http", host="127.0.0.1", port=8080, path="/mcp"))
     # For SSE transport, uncomment the following line:
-    # mcp.run(transport="sse", host="127.0.0.1", port=8000)
+    # asyncio.run(serve(transport="sse", host="127.0.0.1", port=8000))
@@ -11,15 +11,20 @@ Current Sub-Agents:
 """
 
 import asyncio
-import json
+import contextvars
+import functools
+import logging
 import os
+import re
+import time
 from dotenv import load_dotenv
-from typing import Dict, Any, List, Optional, Annotated, Literal
-import importlib.util
-import sys
+from typing import Dict, Any, List, Optional, Annotated, AsyncIterator, Literal, Tuple
 
 # LangGraph imports
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from langchain_core.caches import InMemoryCache
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, START, END
@@ -27,13 +32,80 @@ from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 from typing_extensions import TypedDict
 
-# Import the sub-agents
-from todo import TodoMCPAgent
-from gmail_agent import GmailMCPAgent
+from console import ainput
 from prompts.main_prompt import MASTER_SYSTEM_PROMPT
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Sub-agent responses to read-only requests are reused for identical requests
+# made within this many seconds; the cache holds at most this many entries
+TOOL_CACHE_TTL_SECONDS = 30
+TOOL_CACHE_MAX_ENTRIES = 256
+# Requests that only look things up are cacheable, unless they also ask for a
+# change; any change clears the cache so later reads see it
+READ_REQUEST_RE = re.compile(r"\b(show|list|read|check|find|search)\b")
+WRITE_REQUEST_RE = re.compile(r"\b(send|create|delete|reply|mark|update|add|remove|complete|move)\b")
+
+# Keywords behind the routing hint in run_interactive, matched anywhere in the
+# message in one pass without building a lowercased copy first
+TODO_KEYWORDS = [
+    'task', 'todo', 'reminder', 'due', 'deadline', 'schedule',
+    'productivity', 'organize', 'list', 'complete', 'finish',
+    'create task', 'add task', 'microsoft to-do', 'to-do'
+]
+EMAIL_KEYWORDS = [
+    'email', 'gmail', 'message', 'mail', 'send', 'reply', 'inbox',
+    'compose', 'unread', 'read', 'search', 'find emails', 'check mail',
+    'sent', 'received', 'label', 'star', 'important', '@', 'subject'
+]
+# Tool-bound models by (model, API key, tool names). Binding only converts the
+# tool schemas, which are the same for every instance, so sessions with the
+# same key share one binding instead of regenerating it
+_BOUND_LLM_CACHE: Dict[tuple, Any] = {}
+# Model responses kept by the in-memory LLM cache, oldest dropped first, so a
+# long session's distinct prompts do not pile up for the life of the process
+LLM_CACHE_MAX_ENTRIES = 1000
+
+TODO_KEYWORDS_RE = re.compile("|".join(map(re.escape, TODO_KEYWORDS)), re.IGNORECASE)
+EMAIL_KEYWORDS_RE = re.compile("|".join(map(re.escape, EMAIL_KEYWORDS)), re.IGNORECASE)
+
+def _install_llm_cache():
+    """
+    Reuse model responses for identical prompts across the master and sub-agents.
+    Kept in memory by default; set LLM_CACHE_PATH to keep them in SQLite across
+    runs (needs langchain-community). An already configured cache is left alone.
+    """
+    if get_llm_cache() is not None:
+        return
+    cache_path = os.getenv("LLM_CACHE_PATH")
+    if cache_path:
+        try:
+            from langchain_community.cache import SQLiteCache
+        except ImportError:
+            logger.warning("langchain-community is not installed; caching LLM responses in memory")
+        else:
+            set_llm_cache(SQLiteCache(database_path=cache_path))
+            return
+    set_llm_cache(InMemoryCache(maxsize=LLM_CACHE_MAX_ENTRIES))
+
+
+class SubAgentState:
+    """Conversation state the sub-agents carry between delegated requests"""
+    
+    def __init__(self, gmail_conversation=None):
+        self.todo_state: Optional[Dict[str, Any]] = None
+        self.gmail_conversation = gmail_conversation
+
+
+# Sub-agent state for the request being handled. Batch requests each set
+# their own; everything else uses the agent's shared sub_agent_state
+_request_sub_agent_state: contextvars.ContextVar[Optional[SubAgentState]] = contextvars.ContextVar(
+    "_request_sub_agent_state", default=None
+)
+
+
 class MasterAgentState(TypedDict):
     """State for the Master Agent"""
     messages: Annotated[List, add_messages]
@@ -45,6 +117,11 @@ class MasterAgentState(TypedDict):
 class MasterAgent:
     """Master Agent that orchestrates multiple specialized agents"""
     MASTER_SYSTEM_PROMPT = MASTER_SYSTEM_PROMPT
+    # Context label recorded when the model delegates to each sub-agent tool
+    TOOL_CONTEXTS: Dict[str, str] = {
+        "todo_agent": "Todo Agent",
+        "gmail_agent": "Gmail Agent",
+    }
     def __init__(self, google_api_key: str = None):
         """Initialize the Master Agent"""
         self.google_api_key = google_api_key or os.getenv("GOOGLE_API_KEY")
@@ -52,6 +129,7 @@ class MasterAgent:
             raise ValueError("Google API key is required")
         
         # Initialize LLM
+        _install_llm_cache()
         self.llm = ChatGoogleGenerativeAI(
             model="gemini-2.0-flash-lite",
             google_api_key=self.google_api_key,
@@ -60,14 +138,34 @@ class MasterAgent:
         # Sub-agents
         self.todo_agent = None
         self.gmail_agent = None
+        # Todo state and Gmail conversation carried between delegated requests
+        self.sub_agent_state = SubAgentState()
         self.sub_agents_initialized = False
         
         # Tools and graph
         self.tools = []
         self.graph = None
+        self._llm_with_tools = None
+        self._tool_node = None
+        self._run_config = None
+        
+        # (tool name, normalized request, sub-agent context) -> (expiry, response)
+        self._tool_cache: Dict[tuple, tuple] = {}
+        # Read-only sub-agent requests still running, by the same key; an
+        # identical request made meanwhile awaits the running one
+        self._inflight_requests: Dict[tuple, asyncio.Task] = {}
+        
+        # System message for turns without extra context; never modified
+        self._base_system_message = SystemMessage(content=self.MASTER_SYSTEM_PROMPT)
         
     async def __aenter__(self):
         """Async context manager entry"""
+        # Run new tasks eagerly (Python 3.12+), so coroutines that finish
+        # without blocking, like cache hits, skip a trip through the scheduler
+        eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+        if eager_task_factory is not None:
+            asyncio.get_running_loop().set_task_factory(eager_task_factory)
+        
         await self.initialize_sub_agents()
         await self.setup_tools()
         self.setup_graph()
@@ -82,6 +180,10 @@ class MasterAgent:
         try:
             print("🚀 Initializing Master Agent and sub-agents...")
             
+            # The sub-agent modules are only imported once they are needed
+            from todo import TodoMCPAgent
+            from gmail_agent import get_shared_agent
+            
             # Initialize Todo Agent
             print("📋 Initializing Todo Agent...")
             self.todo_agent = TodoMCPAgent(google_api_key=self.google_api_key)
@@ -89,8 +191,8 @@ class MasterAgent:
             
             # Initialize Gmail Agent
             print("📧 Initializing Gmail Agent...")
-            self.gmail_agent = GmailMCPAgent(google_api_key=self.google_api_key)
-            await self.gmail_agent.__aenter__()
+            self.gmail_agent = await get_shared_agent(google_api_key=self.google_api_key)
+            self.sub_agent_state.gmail_conversation = self.gmail_agent.new_conversation()
             
             self.sub_agents_initialized = True
             print("✅ All sub-agents initialized successfully")
@@ -105,11 +207,85 @@ class MasterAgent:
             if self.todo_agent:
                 await self.todo_agent.__aexit__(None, None, None)
             if self.gmail_agent:
-                await self.gmail_agent.__aexit__(None, None, None)
+                from gmail_agent import close_shared_agent
+                await close_shared_agent()
             print("🧹 Sub-agents cleaned up")
         except Exception as e:
             print(f"⚠️  Error during cleanup: {str(e)}")
 
+    def _cached_tool_response(self, key: tuple) -> Optional[str]:
+        """Get a fresh cached sub-agent response, dropping it if it has expired"""
+        cached = self._tool_cache.get(key)
+        if cached is None:
+            return None
+        if cached[0] <= time.monotonic():
+            del self._tool_cache[key]
+            return None
+        return cached[1]
+
+    def _cache_tool_response(self, key: tuple, response: str):
+        """Store a sub-agent response, evicting the oldest entry when full"""
+        if len(self._tool_cache) >= TOOL_CACHE_MAX_ENTRIES:
+            del self._tool_cache[next(iter(self._tool_cache))]
+        self._tool_cache[key] = (time.monotonic() + TOOL_CACHE_TTL_SECONDS, response)
+
+    def invalidate_tool_cache(self):
+        """Forget all cached sub-agent responses"""
+        self._tool_cache.clear()
+
+    def _current_sub_agent_state(self) -> SubAgentState:
+        """Sub-agent state of the request being handled"""
+        return _request_sub_agent_state.get() or self.sub_agent_state
+
+    @staticmethod
+    def _with_turn(state: Optional[Dict[str, Any]], user_request: str, response: str) -> Dict[str, Any]:
+        """Sub-agent state with a turn answered from the cache added to its history"""
+        turn = [HumanMessage(content=user_request), AIMessage(content=response)]
+        if state is None:
+            return {"messages": turn}
+        state["messages"].extend(turn)
+        return state
+
+    async def _delegate(self, name: str, user_request: str, call, context: tuple, record) -> str:
+        """
+        Run a sub-agent request, serving repeated read-only requests from the cache
+        
+        context is the sub-agent state the reply depends on (e.g. the current
+        list) and is part of the cache key; record(response) adds a reply that
+        did not come from this caller's own call to the sub-agent's history.
+        """
+        request = user_request.strip().lower()
+        key = (name, request, context)
+        if WRITE_REQUEST_RE.search(request) or READ_REQUEST_RE.search(request) is None:
+            # Anything not known to be read-only (e.g. "open Shopping") may
+            # change the context later replies depend on
+            response = await call()
+            self.invalidate_tool_cache()
+            return response
+        
+        cached = self._cached_tool_response(key)
+        if cached is not None:
+            record(cached)
+            return cached
+        
+        # A cancelled caller must not cancel the request the others are waiting on
+        task = self._inflight_requests.get(key)
+        if task is not None:
+            response = await asyncio.shield(task)
+            record(response)
+            return response
+        
+        async def call_and_cache() -> str:
+            response = await call()
+            if not response.startswith("❌"):
+                self._cache_tool_response(key, response)
+            return response
+        
+        task = asyncio.ensure_future(call_and_cache())
+        self._inflight_requests[key] = task
+        task.add_done_callback(lambda _: self._inflight_requests.pop(key, None))
+        return await asyncio.shield(task)
+
     async def setup_tools(self):
         """Setup tools that interface with sub-agents"""
         
@@ -136,16 +312,25 @@ class MasterAgent:
                 
                 print(f"🔄 Delegating to Todo Agent: {user_request}")
                 
-                # Get or initialize todo agent state
-                current_state = getattr(self.todo_agent, '_current_state', None)
+                sub_agent_state = self._current_sub_agent_state()
+                todo_state = sub_agent_state.todo_state
                 
-                # Send request to todo agent
-                response, updated_state = await self.todo_agent.chat(user_request, current_state)
+                async def call_todo_agent() -> str:
+                    # Send request to todo agent with its current state; only the
+                    # agent's own conversation resumes the todo agent's checkpoint,
+                    # batch requests stay independent
+                    response, sub_agent_state.todo_state = await self.todo_agent.chat(
+                        user_request, sub_agent_state.todo_state,
+                        resume=sub_agent_state is self.sub_agent_state
+                    )
+                    
+                    return response
                 
-                # Store updated state
-                self.todo_agent._current_state = updated_state
+                def record(response: str):
+                    sub_agent_state.todo_state = self._with_turn(sub_agent_state.todo_state, user_request, response)
                 
-                return response
+                context = (todo_state.get("current_list_id"),) if todo_state else (None,)
+                return await self._delegate("todo_agent", user_request, call_todo_agent, context, record)
                 
             except Exception as e:
                 return f"❌ Error with Todo Agent: {str(e)}"
@@ -169,21 +354,25 @@ class MasterAgent:
                 user_request: The complete user request about emails/Gmail
             """
             try:
-                if not self.gmail_agent:
+                gmail_conversation = self._current_sub_agent_state().gmail_conversation
+                if not gmail_conversation:
                     return "❌ Gmail Agent is not available. Please try again later."
                 
                 print(f"🔄 Delegating to Gmail Agent: {user_request}")
                 
-                # Get or initialize gmail agent state
-                current_state = getattr(self.gmail_agent, '_current_state', None)
+                def record(response: str):
+                    gmail_conversation.state = self._with_turn(gmail_conversation.state, user_request, response)
                 
-                # Send request to gmail agent
-                response, updated_state = await self.gmail_agent.chat(user_request, current_state)
-                
-                # Store updated state
-                self.gmail_agent._current_state = updated_state
-                
-                return response
+                gmail_state = gmail_conversation.state or {}
+                context = (
+                    gmail_state.get("current_message_id"),
+                    gmail_state.get("current_thread_id"),
+                    gmail_state.get("search_context"),
+                )
+                # The conversation keeps the Gmail agent's state between requests
+                return await self._delegate(
+                    "gmail_agent", user_request, lambda: gmail_conversation.send(user_request), context, record
+                )
                 
             except Exception as e:
                 return f"❌ Error with Gmail Agent: {str(e)}"
@@ -195,11 +384,25 @@ class MasterAgent:
     def setup_graph(self):
         """Setup the LangGraph workflow for the master agent"""
         
-        # Bind tools to LLM
-        llm_with_tools = self.llm.bind_tools(self.tools)
+        # Bind tools to LLM, reusing an identical earlier binding
+        bind_key = (self.llm.model, self.google_api_key, tuple(t.name for t in self.tools))
+        self._llm_with_tools = _BOUND_LLM_CACHE.get(bind_key)
+        if self._llm_with_tools is None:
+            self._llm_with_tools = _BOUND_LLM_CACHE[bind_key] = self.llm.bind_tools(self.tools)
         
         # Create tool node
-        tool_node = ToolNode(self.tools)
+        self._tool_node = ToolNode(self.tools)
+        
+        # The compiled graph is shared by every instance; runs find this
+        # instance's model and tools through their config
+        self.graph = self._compiled_graph()
+        self._run_config = {"configurable": {"master_agent": self}}
+        print("📊 Master Agent workflow compiled successfully")
+
+    @classmethod
+    @functools.cache
+    def _compiled_graph(cls):
+        """Build and compile the agent/tools workflow once per process"""
         
         def should_continue(state: MasterAgentState) -> Literal["tools", "__end__"]:
             """Determine whether to continue to tools or end"""
@@ -209,50 +412,19 @@ class MasterAgent:
             if last_message.tool_calls:
                 return "tools"
             return END
-
-        async def call_model(state: MasterAgentState):
-            """Call the model with current state"""
-            messages = state["messages"]
-            
-            # Add system message
-            system_message = SystemMessage(content=self.MASTER_SYSTEM_PROMPT)
-            
-            # Add context if available
-            context_info = ""
-            if state.get("current_context"):
-                context_info = f"\nCurrent context: Working with {state['current_context']}"
-            
-            if state.get("conversation_summary"):
-                context_info += f"\nConversation summary: {state['conversation_summary']}"
-            
-            if context_info:
-                system_message.content += context_info
-            
-            # Combine system message with conversation
-            full_messages = [system_message] + messages
-            
-            response = await llm_with_tools.ainvoke(full_messages)
-            
-            # Update context based on tool calls
-            updated_context = state.get("current_context")
-            if response.tool_calls:
-                for tool_call in response.tool_calls:
-                    if tool_call["name"] == "todo_agent":
-                        updated_context = "Todo Agent"
-                    elif tool_call["name"] == "gmail_agent":
-                        updated_context = "Gmail Agent"
-            
-            return {
-                "messages": [response],
-                "current_context": updated_context
-            }
-
+        
+        async def call_model(state: MasterAgentState, config: RunnableConfig):
+            return await config["configurable"]["master_agent"]._call_model(state)
+        
+        async def run_tools(state: MasterAgentState, config: RunnableConfig):
+            return await config["configurable"]["master_agent"]._tool_node.ainvoke(state, config)
+        
         # Build graph
         workflow = StateGraph(MasterAgentState)
         
         # Add nodes
         workflow.add_node("agent", call_model)
-        workflow.add_node("tools", tool_node)
+        workflow.add_node("tools", run_tools)
         
         # Add edges
         workflow.add_edge(START, "agent")
@@ -260,8 +432,40 @@ class MasterAgent:
         workflow.add_edge("tools", END)
         
         # Compile the graph
-        self.graph = workflow.compile()
-        print("📊 Master Agent workflow compiled successfully")
+        return workflow.compile()
+
+    async def _call_model(self, state: MasterAgentState):
+        """Call the model with current state"""
+        messages = state["messages"]
+        
+        # Add context if available
+        context_info = ""
+        if state.get("current_context"):
+            context_info = f"\nCurrent context: Working with {state['current_context']}"
+        
+        if state.get("conversation_summary"):
+            context_info += f"\nConversation summary: {state['conversation_summary']}"
+        
+        # Add system message, reusing the shared one when there is no context
+        if context_info:
+            system_message = SystemMessage(content=self.MASTER_SYSTEM_PROMPT + context_info)
+        else:
+            system_message = self._base_system_message
+        
+        # Combine system message with conversation
+        full_messages = [system_message, *messages]
+        
+        response = await self._llm_with_tools.ainvoke(full_messages)
+        
+        # Update context based on tool calls; the last sub-agent called wins
+        updated_context = state.get("current_context")
+        for tool_call in response.tool_calls:
+            updated_context = self.TOOL_CONTEXTS.get(tool_call["name"], updated_context)
+        
+        return {
+            "messages": [response],
+            "current_context": updated_context
+        }
 
     async def chat(self, message: str, state: Optional[MasterAgentState] = None) -> tuple[str, MasterAgentState]:
         """
@@ -277,6 +481,52 @@ class MasterAgent:
         if not self.graph:
             raise RuntimeError("Master Agent not properly initialized")
         
+        # Run the graph
+        result = await self.graph.ainvoke(self._graph_input(message, state), self._run_config)
+        
+        # Extract response
+        last_message = result["messages"][-1]
+        response = last_message.content
+        
+        return response, result
+
+    async def chat_stream(self, message: str, state: Optional[MasterAgentState] = None) -> AsyncIterator[Tuple[str, Optional[MasterAgentState]]]:
+        """
+        Chat with the master agent, streaming the response as it is produced
+        
+        Args:
+            message: User message
+            state: Current conversation state
+            
+        Yields:
+            (text, None) for each chunk of the model's reply, or for a sub-agent's
+            whole response as soon as its tool returns, followed by
+            ("", updated_state) once the run has finished
+        """
+        if not self.graph:
+            raise RuntimeError("Master Agent not properly initialized")
+        
+        result = graph_input = self._graph_input(message, state)
+        streamed_ids = set()
+        
+        async for mode, payload in self.graph.astream(graph_input, self._run_config, stream_mode=["messages", "values"]):
+            if mode == "values":
+                result = payload
+                continue
+            chunk, metadata = payload
+            if metadata.get("langgraph_node") == "agent" and isinstance(chunk.content, str) and chunk.content:
+                streamed_ids.add(chunk.id)
+                yield chunk.content, None
+        
+        # Sub-agent responses end the run as tool messages, so emit them whole
+        last_message = result["messages"][-1]
+        if last_message.id not in streamed_ids and isinstance(last_message.content, str) and last_message.content:
+            yield last_message.content, None
+        
+        yield "", result
+
+    def _graph_input(self, message: str, state: Optional[MasterAgentState]) -> MasterAgentState:
+        """Build the graph input for a new turn, starting a fresh state if none is given"""
         # Initialize state if not provided
         if state is None:
             state = MasterAgentState(
@@ -288,35 +538,15 @@ class MasterAgent:
         
         # Add user message
         state["messages"].append(HumanMessage(content=message))
-        
-        # Run the graph
-        result = await self.graph.ainvoke(state)
-        
-        # Extract response
-        last_message = result["messages"][-1]
-        response = last_message.content
-        
-        return response, result
+        return state
 
     def is_todo_related(self, message: str) -> bool:
         """Helper method to determine if a message is todo-related"""
-        todo_keywords = [
-            'task', 'todo', 'reminder', 'due', 'deadline', 'schedule',
-            'productivity', 'organize', 'list', 'complete', 'finish',
-            'create task', 'add task', 'microsoft to-do', 'to-do'
-        ]
-        message_lower = message.lower()
-        return any(keyword in message_lower for keyword in todo_keywords)
+        return TODO_KEYWORDS_RE.search(message) is not None
 
     def is_email_related(self, message: str) -> bool:
         """Helper method to determine if a message is email-related"""
-        email_keywords = [
-            'email', 'gmail', 'message', 'mail', 'send', 'reply', 'inbox',
-            'compose', 'unread', 'read', 'search', 'find emails', 'check mail',
-            'sent', 'received', 'label', 'star', 'important', '@', 'subject'
-        ]
-        message_lower = message.lower()
-        return any(keyword in message_lower for keyword in email_keywords)
+        return EMAIL_KEYWORDS_RE.search(message) is not None
 
     async def run_interactive(self):
         """Run an interactive chat session"""
@@ -339,7 +569,7 @@ class MasterAgent:
         
         while True:
             try:
-                user_input = input("\n👤 You: ").strip()
+                user_input = (await ainput("\n👤 You: ")).strip()
                 
                 if user_input.lower() in ['quit', 'exit', 'bye', 'q']:
                     print("\n👋 Goodbye! Thanks for using the Master AI Assistant!")
@@ -357,19 +587,48 @@ class MasterAgent:
                 
                 print(f"🤖 Master Agent: Thinking{context_hint}...")
                 
-                # Get response
-                response, state = await self.chat(user_input, state)
-                print(f"🤖 Master Agent: {response}")
+                # Print the response as it arrives
+                print("🤖 Master Agent: ", end="", flush=True)
+                async for text, final_state in self.chat_stream(user_input, state):
+                    if final_state is not None:
+                        state = final_state
+                    else:
+                        print(text, end="", flush=True)
+                print()
                 
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError):
                 print("\n\n👋 Goodbye! Thanks for using the Master AI Assistant!")
                 break
             except Exception as e:
                 print(f"\n❌ Error: {str(e)}")
                 print("Please try again or type 'quit' to exit.")
 
-    async def handle_batch_requests(self, requests: List[str]) -> List[str]:
-        """Handle multiple requests in batch"""
+    async def handle_batch_requests(self, requests: List[str], max_concurrency: int = 8) -> List[str]:
+        """
+        Handle multiple independent requests concurrently
+        
+        Each request runs with its own fresh MasterAgentState and its own todo
+        state and Gmail conversation, so requests neither see nor overwrite each
+        other's history, nor the interactive conversation's. They still share the
+        sub-agents' caches; use handle_sequential_requests for one conversation.
+        At most max_concurrency requests are in flight at once.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def handle_one(i: int, request: str) -> str:
+            # gather runs each request in its own task, so this only applies to it
+            _request_sub_agent_state.set(SubAgentState(
+                self.gmail_agent.new_conversation() if self.gmail_agent else None
+            ))
+            async with semaphore:
+                print(f"Processing request {i+1}/{len(requests)}: {request[:50]}...")
+                response, _ = await self.chat(request, None)
+                return response
+        
+        return list(await asyncio.gather(*(handle_one(i, request) for i, request in enumerate(requests))))
+
+    async def handle_sequential_requests(self, requests: List[str]) -> List[str]:
+        """Handle multiple requests in order, as one conversation"""
         responses = []
         state = None
         
@@ -383,6 +642,10 @@ class MasterAgent:
 
 async def main():
     """Main function to run the master agent"""
+    logging.basicConfig(
+        level=logging.DEBUG if os.getenv("DEBUG", "").lower() == "true" else logging.INFO,
+        format="%(message)s"
+    )
     
     # Get Google API key
     google_api_key = os.getenv("GOOGLE_API_KEY")
@@ -407,4 +670,9 @@ async def main():
         
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        import uvloop
+    except ImportError:  # uvloop is not available on Windows
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file
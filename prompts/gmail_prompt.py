@@ -27,6 +27,7 @@ Available Tools:
 - mark_as_read/unread: Change message read status
 - add_label/remove_label: Manage message labels
 - list_labels: Show available Gmail labels
+- resolve_label: Look up the ID of a label by its name
 
 Remember to be conversational and helpful while maintaining email best practices.
 """
\ No newline at end of file